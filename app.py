@@ -1,36 +1,104 @@
-from flask import Flask, request, jsonify, render_template
-import pandas as pd
+from flask import Flask, request, jsonify, render_template, g
+import base64
+import binascii
+import hashlib
+import hmac
 import logging
+import os
+import time
 import traceback
-from sentiment_model import SentimentAnalyzer
-from recommendation_system import TourismRecommender
+from model_manager import ModelManager
+from response_cache import ResponseCache
+from logging_config import configure_logging, should_log_payload
+from metrics import registry, timed, start_profile, finish_profile
 
 app = Flask(__name__)
-logging.basicConfig(level=logging.DEBUG)
+configure_logging()
 logger = logging.getLogger(__name__)
 
-# Global variables for models
+DINING_CSV = 'data/Dining_cleaned.csv'
+SPOTS_CSV = 'data/Spots_cleaned.csv'
+# 'mean', 'bayesian' or 'wilson'; snapshots keep the method they were built with
+RANKING_METHOD = os.environ.get('RANKING_METHOD', 'mean')
+
+# Kept across reloads so the lexicon and score cache are set up only once
 sentiment_analyzer = None
-recommender = None
 
-def initialize_models():
-    """Initialize the sentiment analyzer and recommender"""
-    global sentiment_analyzer, recommender
-    
+def get_sentiment_analyzer():
+    """Create the sentiment analyzer on first use"""
+    global sentiment_analyzer
+    if sentiment_analyzer is None:
+        # Imported here so serving a snapshot or static pages never loads the scorer
+        from sentiment_model import SentimentAnalyzer
+
+        logger.info("Creating sentiment analyzer...")
+        sentiment_analyzer = SentimentAnalyzer(
+            workers=int(os.environ.get('SENTIMENT_WORKERS', 1)),
+            chunk_size=int(os.environ.get('SENTIMENT_CHUNK_SIZE', 5000)),
+            cache_path=os.environ.get('SENTIMENT_CACHE_PATH', 'data/sentiment_cache.sqlite') or None,
+            backend=os.environ.get('SENTIMENT_BACKEND', 'vader')
+        )
+        logger.info("Sentiment analyzer created successfully")
+    return sentiment_analyzer
+
+# Kept across reloads like the analyzer, so every rebuild reuses the recorded place IDs
+place_registry = None
+
+def get_place_registry():
+    """Open the place ID registry on first use, or return None when PLACE_ID_PATH is empty"""
+    global place_registry
+    path = os.environ.get('PLACE_ID_PATH', 'data/place_ids.sqlite')
+    if place_registry is None and path:
+        from place_dedup import PlaceIdRegistry
+
+        place_registry = PlaceIdRegistry(path)
+    return place_registry
+
+def load_models():
+    """Build the recommender, tagged with the data_version of the files it was built from"""
+    # Taken before any file is read; a file that changes mid-load also trips the watcher
+    data_version = data_fingerprint()
+    recommender = build_models()
+    recommender.data_version = data_version
+    return recommender
+
+def build_models():
+    """Build the recommender from a snapshot if present, else from the CSV files"""
+    # Deferred so the app imports quickly; pandas and the indexes load with the first model
+    from recommendation_system import TourismRecommender
+
     try:
         logger.info("Starting model initialization...")
         
-        # Initialize sentiment analyzer
-        if sentiment_analyzer is None:
-            logger.info("Creating sentiment analyzer...")
-            sentiment_analyzer = SentimentAnalyzer()
-            logger.info("Sentiment analyzer created successfully")
+        # Prefer a prebuilt snapshot: no CSV parsing, lexicon loading or scoring at serve time
+        snapshot_path = os.environ.get('SNAPSHOT_PATH', 'data/snapshot')
+        if snapshot_path and os.path.isdir(snapshot_path):
+            logger.info(f"Loading recommender snapshot from {snapshot_path}...")
+            recommender = TourismRecommender.from_snapshot(snapshot_path)
+            logger.info("Model initialization completed successfully")
+            return recommender
+        
+        # Initialize sentiment analyzer; cached scores mean only changed reviews are rescored
+        analyzer = get_sentiment_analyzer()
+
+        # Large inputs: stream them in bounded chunks instead of loading whole files
+        ingest_chunk_size = int(os.environ.get('INGEST_CHUNK_SIZE', 0))
+        if ingest_chunk_size > 0:
+            from streaming_ingest import build_recommender
+            logger.info(f"Streaming CSV files in chunks of {ingest_chunk_size} rows...")
+            recommender = build_recommender(DINING_CSV, SPOTS_CSV, analyzer, ingest_chunk_size, ranking=RANKING_METHOD,
+                                            place_registry=get_place_registry())
+            logger.info("Model initialization completed successfully")
+            return recommender
 
         # Load CSV files
         logger.info("Loading CSV files...")
         try:
-            dining_df = pd.read_csv('data/Dining_cleaned.csv')
-            spots_df = pd.read_csv('data/Spots_cleaned.csv')
+            import pandas as pd
+
+            with timed('csv_load'):
+                dining_df = pd.read_csv(DINING_CSV)
+                spots_df = pd.read_csv(SPOTS_CSV)
             
             logger.debug(f"Dining.csv columns: {dining_df.columns.tolist()}")
             logger.debug(f"Spots.csv columns: {spots_df.columns.tolist()}")
@@ -42,63 +110,383 @@ def initialize_models():
             raise
 
         # Initialize recommender
-        if recommender is None:
-            logger.info("Creating recommender...")
-            recommender = TourismRecommender(dining_df, spots_df, sentiment_analyzer)
-            logger.info("Recommender created successfully")
+        logger.info("Creating recommender...")
+        recommender = TourismRecommender(dining_df, spots_df, analyzer, ranking=RANKING_METHOD,
+                                         place_registry=get_place_registry())
+        logger.info("Recommender created successfully")
         
         logger.info("Model initialization completed successfully")
+        return recommender
         
     except Exception as e:
         logger.error(f"Error during initialization: {str(e)}")
         raise
 
+# Owns the live recommender; loads it once no matter how many requests race
+models = ModelManager(load_models)
+
+def initialize_models():
+    """Initialize the sentiment analyzer and recommender"""
+    return models.ensure_loaded()
+
+# Serialized /search responses for hot locations; dropped whenever models are swapped
+response_cache = ResponseCache(
+    max_entries=int(os.environ.get('SEARCH_CACHE_SIZE', 1024)),
+    ttl=float(os.environ.get('SEARCH_CACHE_TTL', 300))
+)
+models.add_listener(lambda recommender, version: response_cache.clear())
+
+SEARCH_MAX_AGE = int(os.environ.get('SEARCH_MAX_AGE', 60))
+MAX_TOP_N = 50
+MAX_BATCH_LOCATIONS = int(os.environ.get('MAX_BATCH_LOCATIONS', 50))
+DEFAULT_NEARBY_RADIUS_KM = 2.0
+MAX_NEARBY_RADIUS_KM = 25.0
+DEFAULT_PAGE_SIZE = 10
+# /recommendations category names and the recommender categories behind them
+PAGE_CATEGORIES = {'spots': 'spot', 'dining': 'dining'}
+
+def parse_top_n(value, default=3):
+    """Clamp a top_n parameter to 1..MAX_TOP_N; raises ValueError if not an integer"""
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        raise ValueError("top_n must be an integer")
+    return min(max(int(value), 1), MAX_TOP_N)
+
+def parse_radius_km(value):
+    """Clamp a radius_km parameter to (0, MAX_NEARBY_RADIUS_KM]; raises ValueError if not a number"""
+    if value is None:
+        return DEFAULT_NEARBY_RADIUS_KM
+    if isinstance(value, bool):
+        raise ValueError("radius_km must be a number")
+    radius = float(value)
+    if not radius > 0:
+        raise ValueError("radius_km must be positive")
+    return min(radius, MAX_NEARBY_RADIUS_KM)
+
+def encode_cursor(data_version, offset):
+    """Opaque cursor for the page starting at offset of the data identified by data_version"""
+    return base64.urlsafe_b64encode(f"{data_version}:{offset}".encode('ascii')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """Return (data_version, offset) from encode_cursor(); raises ValueError if malformed"""
+    try:
+        text = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('ascii')
+        data_version, offset = text.split(':')
+        offset = int(offset)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("malformed cursor")
+    if not data_version or offset < 0:
+        raise ValueError("malformed cursor")
+    return data_version, offset
+
+def cached_json_response(entry):
+    """Serve cached JSON bytes with validators so clients and CDNs can reuse them"""
+    response = app.response_class(entry.body, mimetype='application/json')
+    response.set_etag(entry.etag)
+    response.headers['Cache-Control'] = f"public, max-age={SEARCH_MAX_AGE}"
+    # Answers If-None-Match with 304 for GET/HEAD
+    return response.make_conditional(request)
+
+# Allow clients to request a per-request stage breakdown via the X-Profile header
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', '1') == '1'
+
+def _index_sizes():
+    if not models.is_ready():
+        return {}
+    sizes = {}
+    for category, index in (('spot', models.recommender.spots_index), ('dining', models.recommender.dining_index)):
+        sizes[(('category', category), ('kind', 'places'))] = len(index.store)
+        sizes[(('category', category), ('kind', 'locations'))] = len(index)
+    return sizes
+
+def _cache_counts():
+    counts = {}
+    for cache_name, stats in (('response', response_cache.stats()),
+                              ('sentiment', sentiment_analyzer.cache_stats() if sentiment_analyzer else None)):
+        if stats:
+            counts[(('cache', cache_name), ('result', 'hit'))] = stats['hits']
+            counts[(('cache', cache_name), ('result', 'miss'))] = stats['misses']
+    return counts
+
+registry.describe('smarttrav_requests_total', 'counter', 'HTTP requests by endpoint and status')
+registry.describe('smarttrav_request_seconds', 'histogram', 'HTTP request latency by endpoint')
+registry.register_callback('smarttrav_index_size', 'gauge', 'Places and locations in the live index', _index_sizes)
+registry.register_callback('smarttrav_cache_requests_total', 'counter', 'Cache lookups by cache and result', _cache_counts)
+registry.register_callback('smarttrav_models_version', 'gauge', 'Version of the live models (bumped on reload)',
+                           lambda: {(): models.version})
+
+# Touched by /admin/reload; watched like the data files so every worker reloads
+RELOAD_TRIGGER = os.environ.get('RELOAD_TRIGGER_PATH', 'data/reload.trigger')
+
+def data_files():
+    """Files whose changes should trigger a reload"""
+    snapshot_path = os.environ.get('SNAPSHOT_PATH', 'data/snapshot')
+    files = [DINING_CSV, SPOTS_CSV, RELOAD_TRIGGER]
+    return files + [os.path.join(snapshot_path, 'manifest.json')] if snapshot_path else files
+
+def watching_data():
+    return os.environ.get('WATCH_DATA', '1') == '1'
+
+def data_fingerprint():
+    """Identify the data a load reads from the data file signatures and ranking settings
+
+    Unlike models.version, which counts reloads in one process, every worker
+    that loads the same files gets the same value, so it can go to clients.
+    """
+    parts = [RANKING_METHOD, os.environ.get('SENTIMENT_BACKEND', 'vader')]
+    for path in data_files():
+        try:
+            stat = os.stat(path)
+            parts.append(f"{path}:{stat.st_size}:{stat.st_mtime_ns}")
+        except OSError:
+            parts.append(f"{path}:missing")
+    return hashlib.blake2b('\0'.join(parts).encode('utf-8'), digest_size=8).hexdigest()
+
+# Load at import so a preloading server (gunicorn --preload) builds the index
+# once in the master and forked workers share it copy-on-write
+if os.environ.get('PRELOAD_MODELS', '1') == '1':
+    models.preload()
+
 @app.route('/')
 def home():
     return render_template('index.html')
 
-@app.route('/search', methods=['POST'])
+@app.before_request
+def start_data_watcher():
+    # Started lazily so each forked worker runs its own watcher thread
+    if watching_data() and models.watch(data_files(), float(os.environ.get('WATCH_INTERVAL', 5))):
+        # The files may have changed between the preload in the master and this worker's first request
+        if models.is_ready() and models.recommender.data_version != data_fingerprint():
+            models.reload()
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    if PROFILING_ENABLED and request.headers.get('X-Profile'):
+        start_profile()
+
+@app.after_request
+def record_request_metrics(response):
+    elapsed = time.perf_counter() - g.get('request_start', time.perf_counter())
+    endpoint = request.endpoint or 'unknown'
+    registry.inc('smarttrav_requests_total', (('endpoint', endpoint), ('status', str(response.status_code))))
+    registry.observe('smarttrav_request_seconds', elapsed, (('endpoint', endpoint),))
+
+    # Stage breakdown for profiled requests, in the standard Server-Timing format
+    profile = finish_profile()
+    if profile is not None:
+        timings = [f"{stage};dur={seconds * 1000:.3f}" for stage, seconds in profile]
+        timings.append(f"total;dur={elapsed * 1000:.3f}")
+        response.headers['Server-Timing'] = ", ".join(timings)
+    return response
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus text exposition of latency histograms, counters and index sizes"""
+    return app.response_class(registry.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/admin/reload', methods=['POST'])
+def admin_reload():
+    """Rebuild the index in the background in every worker and swap it in when ready
+
+    Only available when ADMIN_TOKEN is set; requests must send it in the
+    X-Admin-Token header. Behind a reverse proxy every request looks local,
+    so there is no unauthenticated fallback. Without a token, reload by
+    updating the data or snapshot files or by restarting the server.
+
+    The endpoint touches RELOAD_TRIGGER, which each worker's data watcher
+    picks up within WATCH_INTERVAL seconds. With WATCH_DATA=0 there are no
+    watchers, so only the worker that received the request reloads, and
+    the response says so.
+    """
+    admin_token = os.environ.get('ADMIN_TOKEN')
+    if not admin_token:
+        return jsonify({"error": "Not found"}), 404
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), admin_token):
+        return jsonify({"error": "Forbidden"}), 403
+
+    if watching_data():
+        directory = os.path.dirname(RELOAD_TRIGGER)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(RELOAD_TRIGGER, 'a'):
+            os.utime(RELOAD_TRIGGER)
+        return jsonify({"reloading": True, "scope": "all_workers", "version": models.version}), 202
+
+    started = models.reload()
+    return jsonify({
+        "reloading": True,
+        "scope": "this_worker",
+        "started": started,
+        "version": models.version,
+        "warning": "WATCH_DATA is off, so other workers keep their current models"
+    }), 202
+
+@app.route('/healthz')
+def healthz():
+    """Liveness: the process is up"""
+    return jsonify({"status": "ok"})
+
+@app.route('/ready')
+def ready():
+    """Readiness: only report ready once the recommendation index is warm
+
+    A cold worker (PRELOAD_MODELS=0 or a failed preload) starts loading in
+    the background here, so probes warm it up without routing it traffic.
+    """
+    if not models.is_ready():
+        models.load_in_background()
+    status = models.status()
+    return jsonify(status), 200 if status['ready'] else 503
+
+@app.route('/locations/suggest', methods=['GET'])
+def suggest_locations():
+    """Autocomplete locations from the prebuilt trie/trigram index"""
+    prefix = request.args.get('q', '')
+    try:
+        limit = int(request.args.get('limit', 10))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+
+    recommender = models.get()
+    suggestions = recommender.location_index.suggest(prefix, limit) if prefix.strip() else []
+
+    response = jsonify({
+        "query": prefix,
+        "suggestions": [{"location": location, "display": location.title()} for location in suggestions]
+    })
+    response.headers['Cache-Control'] = f"public, max-age={SEARCH_MAX_AGE}"
+    return response
+
+@app.route('/search', methods=['GET', 'POST'])
 def search():
     try:
-        data = request.get_json()
-        logger.info(f"Received search request: {data}")
+        # GET makes results cacheable by browsers and CDNs; POST is kept for existing clients
+        data = request.get_json(silent=True) if request.method == 'POST' else request.args
+        if should_log_payload(logger):
+            logger.debug("Received search request: %s", data)
         
         if not data or 'location' not in data:
             return jsonify({"error": "Missing location parameter"}), 400
 
-        location = data['location'].lower().strip()  # Standardize location
-        logger.info(f"Searching for location: {location}")
+        location = str(data['location']).lower().strip()  # Standardize location
+        logger.debug("Searching for location: %s", location)
         
+        try:
+            top_n = parse_top_n(data.get('top_n'))
+        except (TypeError, ValueError):
+            return jsonify({"error": "top_n must be an integer"}), 400
+
+        # q="seafood" ranks places by matching review text instead of overall sentiment
+        query = ' '.join(str(data.get('q') or '').lower().split())
+
+        # nearby=1 pairs each place with the best dining within radius_km of it
+        nearby = str(data.get('nearby', '')).lower() in ('1', 'true', 'yes')
+        try:
+            radius_km = parse_radius_km(data.get('radius_km')) if nearby else None
+        except (TypeError, ValueError):
+            return jsonify({"error": "radius_km must be a positive number"}), 400
+
+        # Read the version before fetching models: a result can then only ever
+        # be filed under a key that is older than the data it was built from
+        cache_key = (models.version, location, top_n, radius_km, query)
+        entry = response_cache.get(cache_key)
+        if entry is not None:
+            return cached_json_response(entry)
+
         # Initialize models if not already done
-        if sentiment_analyzer is None or recommender is None:
-            initialize_models()
+        recommender = models.get()
 
         # Get recommendations
-        recommendations = recommender.get_recommendations(location)
-        logger.info(f"Raw recommendations: {recommendations}")
+        if query:
+            recommendations = recommender.search_reviews(location, query, top_n)
+        else:
+            recommendations = recommender.get_recommendations(location, top_n)
+        if nearby:
+            recommender.attach_nearby_dining(recommendations, top_n, radius_km)
+        if should_log_payload(logger):
+            logger.debug("Raw recommendations: %s", recommendations)
         
         if not recommendations['tourist_places'] and not recommendations['dining_spots']:
-            logger.warning(f"No recommendations found for location: {location}")
-            return jsonify({
+            logger.warning("No recommendations found for location: %s", location)
+            payload = {
                 "places": [],
                 "dining": [],
                 "message": f"No places found in {location}"
-            })
+            }
+        else:
+            # Format recommendations
+            with timed('format'):
+                tourist_places = recommender.format_recommendations(recommendations['tourist_places'])
+                dining_spots = recommender.format_recommendations(recommendations['dining_spots'])
+            
+            if should_log_payload(logger):
+                logger.debug("Formatted tourist places: %s", tourist_places)
+                logger.debug("Formatted dining spots: %s", dining_spots)
 
-        # Format recommendations
-        tourist_places = recommender.format_recommendations(recommendations['tourist_places'])
-        dining_spots = recommender.format_recommendations(recommendations['dining_spots'])
-        
-        logger.info(f"Formatted tourist places: {tourist_places}")
-        logger.info(f"Formatted dining spots: {dining_spots}")
+            payload = {
+                "location": recommendations['location'].title(),
+                "places": tourist_places,
+                "dining": dining_spots
+            }
+
+        with timed('serialize'):
+            body = app.json.dumps(payload).encode('utf-8')
+        entry = response_cache.set(cache_key, body)
+        return cached_json_response(entry)
+
+    except Exception as e:
+        error_msg = f"Error processing search request: {str(e)}\n{traceback.format_exc()}"
+        logger.error(error_msg)
+        return jsonify({
+            "error": "An error occurred while processing your request",
+            "details": str(e)
+        }), 500
+
+@app.route('/search/batch', methods=['POST'])
+def search_batch():
+    """Recommendations for many locations in one request
+
+    Body: {"locations": [...], "top_n": 3} where top_n may also be
+    {"places": 3, "dining": 5}. Results come back in request order.
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not data or not isinstance(data.get('locations'), list) or not data['locations']:
+            return jsonify({"error": "Missing locations list"}), 400
+        if len(data['locations']) > MAX_BATCH_LOCATIONS:
+            return jsonify({"error": f"At most {MAX_BATCH_LOCATIONS} locations per request"}), 400
+
+        top_n = data.get('top_n')
+        try:
+            if isinstance(top_n, dict):
+                places_top_n = parse_top_n(top_n.get('places'))
+                dining_top_n = parse_top_n(top_n.get('dining'))
+            else:
+                places_top_n = dining_top_n = parse_top_n(top_n)
+        except (TypeError, ValueError):
+            return jsonify({"error": "top_n must be an integer or {places, dining} integers"}), 400
+
+        logger.debug("Received batch search for %d locations", len(data['locations']))
+
+        # One recommender reference for the whole batch, so every result comes from the same version
+        recommender = models.get()
+        batch = recommender.get_batch_recommendations(
+            [str(location) for location in data['locations']], places_top_n, dining_top_n
+        )
 
         return jsonify({
-            "places": tourist_places,
-            "dining": dining_spots
+            "results": [{
+                "query": query,
+                "location": recommendations['location'].title(),
+                "places": recommender.format_recommendations(recommendations['tourist_places']),
+                "dining": recommender.format_recommendations(recommendations['dining_spots'])
+            } for query, recommendations in batch]
         })
 
     except Exception as e:
-        error_msg = f"Error processing search request: {str(e)}\n{traceback.format_exc()}"
+        error_msg = f"Error processing batch search request: {str(e)}\n{traceback.format_exc()}"
         logger.error(error_msg)
         return jsonify({
             "error": "An error occurred while processing your request",
@@ -107,20 +495,80 @@ def search():
 
 @app.route('/recommendations', methods=['GET'])
 def get_recommendations():
-    location = request.args.get('location')
-    
-    # Filter by location first
-    dining_filtered = dining_df[dining_df['Location'] == location]
-    spots_filtered = spots_df[spots_df['Location'] == location]
-    
-    # Get top 3 by sentiment score
-    dining_recommendations = dining_filtered.nlargest(3, 'sentiment_score').to_dict('records')
-    spots_recommendations = spots_filtered.nlargest(3, 'sentiment_score').to_dict('records')
-    
-    return jsonify({
-        'dining': dining_recommendations,
-        'spots': spots_recommendations
-    })
+    """Paginated per-location rankings served from the precomputed index
+
+    Query: location, optional category (spots or dining, default both),
+    limit (default 10) and either offset or the next_cursor of the previous
+    page. Cursors expire when the data files change, in every worker alike.
+    """
+    try:
+        location = str(request.args.get('location', '')).lower().strip()
+        if not location:
+            return jsonify({"error": "Missing location parameter"}), 400
+
+        category = request.args.get('category')
+        if category is None:
+            categories = tuple(PAGE_CATEGORIES)
+        elif category in PAGE_CATEGORIES:
+            categories = (category,)
+        else:
+            return jsonify({"error": f"category must be one of {', '.join(PAGE_CATEGORIES)}"}), 400
+
+        try:
+            limit = parse_top_n(request.args.get('limit'), DEFAULT_PAGE_SIZE)
+        except (TypeError, ValueError):
+            return jsonify({"error": "limit must be an integer"}), 400
+
+        # One recommender for the whole page: its data_version names the data
+        # every page comes from, whichever worker serves it
+        recommender = models.get()
+        version = recommender.data_version
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                cursor_version, offset = decode_cursor(cursor)
+            except ValueError:
+                return jsonify({"error": "Invalid cursor"}), 400
+            if cursor_version != version:
+                return jsonify({"error": "Cursor has expired, start again from the first page"}), 410
+        else:
+            try:
+                offset = int(request.args.get('offset', 0))
+            except (TypeError, ValueError):
+                return jsonify({"error": "offset must be an integer"}), 400
+            if offset < 0:
+                return jsonify({"error": "offset must not be negative"}), 400
+
+        cache_key = ('recommendations', version, location, categories, offset, limit)
+        entry = response_cache.get(cache_key)
+        if entry is not None:
+            return cached_json_response(entry)
+
+        page = recommender.get_ranked_page(
+            location, offset, limit, [PAGE_CATEGORIES[name] for name in categories]
+        )
+
+        payload = {"location": page['location'].title(), "offset": offset, "limit": limit}
+        has_more = False
+        with timed('format'):
+            for name in categories:
+                records, total = page['pages'][PAGE_CATEGORIES[name]]
+                payload[name] = {"total": total, "items": recommender.format_recommendations(records)}
+                has_more = has_more or offset + limit < total
+        payload["next_cursor"] = encode_cursor(version, offset + limit) if has_more else None
+
+        with timed('serialize'):
+            body = app.json.dumps(payload).encode('utf-8')
+        entry = response_cache.set(cache_key, body)
+        return cached_json_response(entry)
+
+    except Exception as e:
+        error_msg = f"Error processing recommendations request: {str(e)}\n{traceback.format_exc()}"
+        logger.error(error_msg)
+        return jsonify({
+            "error": "An error occurred while processing your request",
+            "details": str(e)
+        }), 500
 
 if __name__ == '__main__':
     try:
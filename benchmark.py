@@ -0,0 +1,231 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+def make_review_corpus(source_path, size):
+    """Build a corpus of distinct reviews by cycling through the source reviews"""
+    reviews = pd.read_csv(source_path)['Review'].dropna().astype(str).tolist()
+    # Suffix each copy so the analyzer cannot skip it as a duplicate
+    return pd.Series([f"{reviews[i % len(reviews)]} Visit {i}." for i in range(size)])
+
+def _percentiles(samples):
+    samples = np.asarray(samples)
+    return {
+        'p50_ms': round(float(np.percentile(samples, 50)) * 1000, 4),
+        'p95_ms': round(float(np.percentile(samples, 95)) * 1000, 4),
+        'p99_ms': round(float(np.percentile(samples, 99)) * 1000, 4),
+        'mean_ms': round(float(samples.mean()) * 1000, 4)
+    }
+
+def _datasets(size, seed):
+    from synthetic_data import generate_dataframe
+    dining_df = generate_dataframe(size, seed=seed)
+    spots_df = generate_dataframe(max(size // 2, 1), seed=seed + 1)
+    return dining_df, spots_df
+
+def _build_recommender(size, seed):
+    from sentiment_model import SentimentAnalyzer
+    from recommendation_system import TourismRecommender
+    dining_df, spots_df = _datasets(size, seed)
+    return TourismRecommender(dining_df, spots_df, SentimentAnalyzer()), dining_df
+
+def _query_mix(dining_df, queries, seed):
+    """Locations drawn with the dataset's own skew, so hot cities dominate like real traffic"""
+    rng = np.random.default_rng(seed)
+    return rng.choice(dining_df['Location'].to_numpy(), size=queries).tolist()
+
+def bench_sentiment_scaling(args):
+    """Time score_reviews on 1..N worker processes and check results match the serial path"""
+    from sentiment_model import SentimentAnalyzer
+
+    reviews = make_review_corpus(args.source, args.reviews)
+    results = []
+    baseline = None
+
+    for workers in range(1, args.max_workers + 1):
+        analyzer = SentimentAnalyzer(workers=workers, chunk_size=args.chunk_size)
+        start = time.perf_counter()
+        scores = analyzer.score_reviews(reviews)
+        elapsed = time.perf_counter() - start
+
+        if baseline is None:
+            baseline = (scores, elapsed)
+
+        results.append({
+            'workers': workers,
+            'seconds': round(elapsed, 4),
+            'reviews_per_second': round(len(reviews) / elapsed, 1),
+            'speedup': round(baseline[1] / elapsed, 2),
+            'identical': bool(np.array_equal(scores, baseline[0]))
+        })
+
+    return {
+        'benchmark': 'sentiment-scaling',
+        'reviews': len(reviews),
+        'chunk_size': args.chunk_size,
+        'results': results
+    }
+
+def bench_analyze_reviews(size, args):
+    """SentimentAnalyzer.analyze_reviews on a synthetic dining dataset"""
+    from sentiment_model import SentimentAnalyzer
+    dining_df, _ = _datasets(size, args.seed)
+    analyzer = SentimentAnalyzer()
+    start = time.perf_counter()
+    analyzer.analyze_reviews(dining_df)
+    elapsed = time.perf_counter() - start
+    return {'seconds': round(elapsed, 4), 'reviews_per_second': round(size / elapsed, 1)}
+
+def bench_recommender_build(size, args):
+    """TourismRecommender construction, including cleaning, scoring and ranking"""
+    from sentiment_model import SentimentAnalyzer
+    from recommendation_system import TourismRecommender
+    dining_df, spots_df = _datasets(size, args.seed)
+    analyzer = SentimentAnalyzer()
+    start = time.perf_counter()
+    recommender = TourismRecommender(dining_df, spots_df, analyzer)
+    elapsed = time.perf_counter() - start
+    return {
+        'seconds': round(elapsed, 4),
+        'places': len(recommender.dining_index.store) + len(recommender.spots_index.store),
+        'index_bytes': recommender.dining_index.store.nbytes + recommender.spots_index.store.nbytes
+    }
+
+def bench_recommend_latency(size, args):
+    """get_recommendations latency over a skewed query mix"""
+    recommender, dining_df = _build_recommender(size, args.seed)
+    queries = _query_mix(dining_df, args.queries, args.seed)
+    samples = []
+    for location in queries:
+        start = time.perf_counter()
+        recommender.get_recommendations(location, args.top_n)
+        samples.append(time.perf_counter() - start)
+    return {'queries': len(queries), **_percentiles(samples)}
+
+def bench_search_throughput(size, args):
+    """End-to-end /search through the Flask test client, with and without the response cache"""
+    os.environ.setdefault('PRELOAD_MODELS', '0')
+    os.environ.setdefault('WATCH_DATA', '0')
+    import app as app_module
+    from model_manager import ModelManager
+
+    recommender, dining_df = _build_recommender(size, args.seed)
+    app_module.models = ModelManager(lambda: recommender)
+    app_module.models.ensure_loaded()
+    client = app_module.app.test_client()
+    queries = _query_mix(dining_df, args.queries, args.seed)
+
+    results = {}
+    for mode, max_entries in (('uncached', 0), ('cached', 1024)):
+        app_module.response_cache.clear()
+        app_module.response_cache.max_entries = max_entries
+        samples = []
+        start = time.perf_counter()
+        for location in queries:
+            request_start = time.perf_counter()
+            response = client.get('/search', query_string={'location': location, 'top_n': args.top_n})
+            samples.append(time.perf_counter() - request_start)
+            if response.status_code != 200:
+                raise RuntimeError(f"/search returned {response.status_code}")
+        elapsed = time.perf_counter() - start
+        results[mode] = {'requests_per_second': round(len(queries) / elapsed, 1), **_percentiles(samples)}
+    return results
+
+# Timed in a fresh interpreter each run, so nothing is already imported or cached
+STARTUP_STEPS = {
+    'import_app': "import app",
+    'sentiment_analyzer_init': "from sentiment_model import SentimentAnalyzer; SentimentAnalyzer()"
+}
+
+def bench_startup(args):
+    """Cold import and sentiment analyzer initialization times"""
+    env = dict(os.environ, PRELOAD_MODELS='0', WATCH_DATA='0')
+    results = {}
+    for step, code in STARTUP_STEPS.items():
+        script = f"import time; start = time.perf_counter(); {code}; print(time.perf_counter() - start)"
+        samples = [
+            float(subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True,
+                                 env=env).stdout.strip().splitlines()[-1])
+            for _ in range(args.runs)
+        ]
+        results[step] = _percentiles(samples)
+    return {'benchmark': 'startup', 'runs': args.runs, 'results': results}
+
+SUITE = {
+    'analyze-reviews': bench_analyze_reviews,
+    'recommender-build': bench_recommender_build,
+    'recommend-latency': bench_recommend_latency,
+    'search-throughput': bench_search_throughput
+}
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return None
+
+def run_suite(args):
+    """Run the selected benchmarks at every requested dataset size"""
+    names = list(SUITE) if not args.benchmarks or 'all' in args.benchmarks else args.benchmarks
+    results = []
+    for size in args.sizes:
+        for name in names:
+            logger.warning(f"Running {name} with {size} reviews")
+            results.append({'benchmark': name, 'reviews': size, **SUITE[name](size, args)})
+    return {'benchmark': 'suite', 'results': results}
+
+def main():
+    parser = argparse.ArgumentParser(description="SmartTrav performance benchmarks")
+    parser.add_argument('--output', help="Write the JSON report to this file as well")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    scaling = subparsers.add_parser('sentiment-scaling', help="Parallel sentiment scoring across 1..N cores")
+    scaling.add_argument('--source', default='data/Dining_cleaned.csv')
+    scaling.add_argument('--reviews', type=int, default=50000)
+    scaling.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    scaling.add_argument('--chunk-size', type=int, default=2000)
+    scaling.set_defaults(func=bench_sentiment_scaling)
+
+    startup = subparsers.add_parser('startup', help="Cold import and analyzer init time in fresh interpreters")
+    startup.add_argument('--runs', type=int, default=10)
+    startup.set_defaults(func=bench_startup)
+
+    suite = subparsers.add_parser('suite', help="Recommender and API benchmarks on synthetic datasets")
+    suite.add_argument('--only', dest='benchmarks', nargs='+', choices=['all', *SUITE],
+                       help="Benchmarks to run (default: all)")
+    suite.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000],
+                       help="Synthetic review counts, e.g. 1000 100000 10000000")
+    suite.add_argument('--queries', type=int, default=2000)
+    suite.add_argument('--top-n', type=int, default=3)
+    suite.add_argument('--seed', type=int, default=0)
+    suite.set_defaults(func=run_suite)
+
+    args = parser.parse_args()
+    report = {
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'started_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        **args.func(args)
+    }
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,26 @@
 import pandas as pd
 import logging
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+REQUIRED_COLUMNS = ['Place', 'Review', 'Location']
+
+def validate_dataframe(df):
+    """Return (missing required columns, empty value counts per column) for a file or chunk"""
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    return missing_columns, df.isna().sum()
+
+def _log_validation(missing_columns, empty_counts):
+    if missing_columns:
+        logger.error(f"Missing required columns: {missing_columns}")
+    else:
+        logger.info("All required columns present")
+        
+    # Check for empty values
+    for col, empty_count in empty_counts.items():
+        if empty_count > 0:
+            logger.warning(f"Column '{col}' has {empty_count} empty values")
+
 def validate_csv_file(file_path):
     try:
         df = pd.read_csv(file_path)
@@ -11,27 +28,45 @@ def validate_csv_file(file_path):
         logger.info(f"Columns found: {df.columns.tolist()}")
         logger.info(f"Number of rows: {len(df)}")
         
-        # Check for required columns
-        required_columns = ['Place', 'Review', 'Location']
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        
-        if missing_columns:
-            logger.error(f"Missing required columns: {missing_columns}")
-        else:
-            logger.info("All required columns present")
-            
-        # Check for empty values
-        for col in df.columns:
-            empty_count = df[col].isna().sum()
-            if empty_count > 0:
-                logger.warning(f"Column '{col}' has {empty_count} empty values")
+        _log_validation(*validate_dataframe(df))
                 
         return df
     except Exception as e:
         logger.error(f"Error loading {file_path}: {str(e)}")
         return None
 
+def validate_csv_file_chunked(file_path, chunksize=100000):
+    """Validate a CSV too large for memory; returns a summary dict, or None on error"""
+    try:
+        rows = 0
+        columns = None
+        missing_columns = []
+        empty_counts = None
+        for chunk in pd.read_csv(file_path, chunksize=chunksize):
+            chunk_missing, chunk_empty = validate_dataframe(chunk)
+            if columns is None:
+                columns, missing_columns = chunk.columns.tolist(), chunk_missing
+            empty_counts = chunk_empty if empty_counts is None else empty_counts.add(chunk_empty, fill_value=0)
+            rows += len(chunk)
+        
+        logger.info(f"Successfully scanned {file_path}")
+        logger.info(f"Columns found: {columns}")
+        logger.info(f"Number of rows: {rows}")
+        _log_validation(missing_columns, empty_counts if empty_counts is not None else pd.Series(dtype=int))
+        
+        return {
+            'rows': rows,
+            'columns': columns,
+            'missing_columns': missing_columns,
+            'empty_counts': {} if empty_counts is None else {col: int(n) for col, n in empty_counts.items()}
+        }
+    except Exception as e:
+        logger.error(f"Error loading {file_path}: {str(e)}")
+        return None
+
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    
     # Validate both CSV files
     dining_df = validate_csv_file('data/Dining.csv')
     spots_df = validate_csv_file('data/Spots.csv') 
\ No newline at end of file
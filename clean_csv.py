@@ -1,27 +1,30 @@
 import pandas as pd
 import logging
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+def clean_dataframe(df):
+    """Apply the cleaning rules to a whole file or to one chunk of it"""
+    # Rename unnamed columns to proper names
+    if 'Unnamed: 0' in df.columns:
+        df = df.rename(columns={
+            'Unnamed: 0': 'Place',
+            'Unnamed: 1': 'Review',
+            'Unnamed: 2': 'Location'
+        })
+    
+    # Remove any remaining unnamed columns
+    df = df.loc[:, ~df.columns.str.contains('^Unnamed')]
+    
+    # Remove rows where all values are NaN
+    return df.dropna(how='all')
+
 def clean_csv_file(input_path, output_path):
     try:
         # Read the CSV file, skipping empty rows at the beginning
         df = pd.read_csv(input_path, skiprows=2)
         
-        # Rename unnamed columns to proper names
-        if 'Unnamed: 0' in df.columns:
-            df = df.rename(columns={
-                'Unnamed: 0': 'Place',
-                'Unnamed: 1': 'Review',
-                'Unnamed: 2': 'Location'
-            })
-        
-        # Remove any remaining unnamed columns
-        df = df.loc[:, ~df.columns.str.contains('^Unnamed')]
-        
-        # Remove rows where all values are NaN
-        df = df.dropna(how='all')
+        df = clean_dataframe(df)
         
         # Reset index
         df = df.reset_index(drop=True)
@@ -39,7 +42,32 @@ def clean_csv_file(input_path, output_path):
         logger.error(f"Error cleaning {input_path}: {str(e)}")
         return None
 
+def clean_csv_file_chunked(input_path, output_path, chunksize=100000):
+    """Clean a CSV too large for memory, one bounded chunk at a time
+
+    Returns the number of rows written, or None on error.
+    """
+    try:
+        rows = 0
+        reader = pd.read_csv(input_path, skiprows=2, chunksize=chunksize)
+        for chunk_number, chunk in enumerate(reader):
+            chunk = clean_dataframe(chunk)
+            chunk.to_csv(output_path, index=False, mode='w' if chunk_number == 0 else 'a',
+                         header=chunk_number == 0)
+            rows += len(chunk)
+        
+        logger.info(f"Successfully cleaned and saved {output_path}")
+        logger.info(f"Number of rows: {rows}")
+        
+        return rows
+    
+    except Exception as e:
+        logger.error(f"Error cleaning {input_path}: {str(e)}")
+        return None
+
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    
     # Clean both CSV files
     dining_df = clean_csv_file('data/Dining.csv', 'data/Dining_cleaned.csv')
     spots_df = clean_csv_file('data/Spots.csv', 'data/Spots_cleaned.csv')
@@ -0,0 +1,149 @@
+import heapq
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Mean Earth radius (IUGG)
+EARTH_RADIUS_KM = 6371.0088
+
+def to_unit_vectors(latitudes, longitudes):
+    """Map degrees of latitude/longitude onto points of the unit sphere"""
+    lat = np.radians(np.asarray(latitudes, dtype=np.float64))
+    lon = np.radians(np.asarray(longitudes, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+def _chord(distance_km):
+    """Straight-line distance through the unit sphere for a great-circle distance"""
+    return 2 * np.sin(min(distance_km / EARTH_RADIUS_KM, np.pi) / 2)
+
+def _great_circle_km(chords):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(np.asarray(chords) / 2, 1.0))
+
+class GeoIndex:
+    """Static KD-tree over place coordinates
+
+    Points live on the unit sphere in 3D, where the chord length grows with
+    the great-circle distance, so the tree needs no special cases for the
+    poles or the antimeridian. Rows without coordinates are left out.
+    """
+
+    def __init__(self, latitudes, longitudes, leaf_size=16):
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        valid = np.isfinite(latitudes) & np.isfinite(longitudes)
+        self.rows = np.flatnonzero(valid)
+        self.points = to_unit_vectors(latitudes[valid], longitudes[valid])
+        self.leaf_size = max(1, int(leaf_size))
+        self._build()
+        logger.info(f"Built geo index over {len(self.rows)} of {len(latitudes)} places")
+
+    def _build(self):
+        """Split each node at the median of its widest axis; rows/points are reordered in place"""
+        starts, ends, lefts, rights, mins, maxs = [], [], [], [], [], []
+        stack = [(0, len(self.rows), -1, False)] if len(self.rows) else []
+        while stack:
+            start, end, parent, is_right = stack.pop()
+            node = len(starts)
+            if parent >= 0:
+                (rights if is_right else lefts)[parent] = node
+
+            points = self.points[start:end]
+            low, high = points.min(axis=0), points.max(axis=0)
+            starts.append(start)
+            ends.append(end)
+            lefts.append(-1)
+            rights.append(-1)
+            mins.append(low)
+            maxs.append(high)
+
+            if end - start > self.leaf_size:
+                axis = int(np.argmax(high - low))
+                mid = (start + end) // 2
+                order = np.argpartition(points[:, axis], mid - start)
+                self.points[start:end] = points[order]
+                self.rows[start:end] = self.rows[start:end][order]
+                stack.append((mid, end, node, True))
+                stack.append((start, mid, node, False))
+
+        self._starts = np.asarray(starts, dtype=np.int64)
+        self._ends = np.asarray(ends, dtype=np.int64)
+        self._lefts = np.asarray(lefts, dtype=np.int64)
+        self._rights = np.asarray(rights, dtype=np.int64)
+        self._mins = np.asarray(mins, dtype=np.float64).reshape(-1, 3)
+        self._maxs = np.asarray(maxs, dtype=np.float64).reshape(-1, 3)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _box_distance(self, node, point):
+        """Lower bound on the chord distance from point to anything under node"""
+        gap = np.maximum(np.maximum(self._mins[node] - point, point - self._maxs[node]), 0)
+        return float(np.sqrt(gap @ gap))
+
+    def _leaf_distances(self, node, point):
+        delta = self.points[self._starts[node]:self._ends[node]] - point
+        return np.sqrt(np.einsum('ij,ij->i', delta, delta))
+
+    def within(self, latitude, longitude, radius_km):
+        """All rows within radius_km, nearest first, as (rows, distances_km)"""
+        if not len(self.rows):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        point = to_unit_vectors([latitude], [longitude])[0]
+        limit = _chord(radius_km)
+
+        rows, chords = [], []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            if self._box_distance(node, point) > limit:
+                continue
+            if self._lefts[node] < 0:
+                distances = self._leaf_distances(node, point)
+                hits = distances <= limit
+                rows.append(self.rows[self._starts[node]:self._ends[node]][hits])
+                chords.append(distances[hits])
+            else:
+                stack.append(self._lefts[node])
+                stack.append(self._rights[node])
+
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        rows, chords = np.concatenate(rows), np.concatenate(chords)
+        order = np.argsort(chords, kind='stable')
+        return rows[order], _great_circle_km(chords[order])
+
+    def nearest(self, latitude, longitude, k, max_distance_km=None):
+        """The k nearest rows, nearest first, as (rows, distances_km)
+
+        Nodes are visited closest-first and pruned once they cannot beat the
+        current k-th best, so a lookup touches O(log n + k) nodes on average.
+        """
+        if not len(self.rows) or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        point = to_unit_vectors([latitude], [longitude])[0]
+        limit = _chord(max_distance_km) if max_distance_km is not None else np.inf
+
+        best = []  # max-heap of (-chord, row) holding the k best so far
+        nodes = [(self._box_distance(0, point), 0)]
+        while nodes:
+            bound, node = heapq.heappop(nodes)
+            if bound > limit or (len(best) == k and bound > -best[0][0]):
+                break
+            if self._lefts[node] < 0:
+                distances = self._leaf_distances(node, point)
+                for row, chord in zip(self.rows[self._starts[node]:self._ends[node]], distances):
+                    if chord > limit:
+                        continue
+                    if len(best) < k:
+                        heapq.heappush(best, (-chord, int(row)))
+                    elif chord < -best[0][0]:
+                        heapq.heapreplace(best, (-chord, int(row)))
+            else:
+                for child in (self._lefts[node], self._rights[node]):
+                    heapq.heappush(nodes, (self._box_distance(child, point), int(child)))
+
+        best.sort(key=lambda item: (-item[0], item[1]))
+        rows = np.fromiter((row for _, row in best), dtype=np.int64, count=len(best))
+        return rows, _great_circle_km([-negative_chord for negative_chord, _ in best])
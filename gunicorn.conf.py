@@ -0,0 +1,10 @@
+# gunicorn -c gunicorn.conf.py app:app
+import os
+
+bind = os.environ.get('BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# Import app (and build the recommendation index) in the master before forking,
+# so every worker starts warm and shares the index pages copy-on-write
+preload_app = True
@@ -0,0 +1,131 @@
+import logging
+import re
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+# Alternate names for cities in the data set, applied when the target exists
+LOCATION_ALIASES = {
+    'cochin': 'kochi',
+    'ernakulam': 'kochi',
+    'calicut': 'kozhikode',
+    'thiruvananthapuram': 'trivandrum',
+    'tvm': 'trivandrum'
+}
+
+def normalize_location(text):
+    """Lowercase and collapse whitespace, matching how locations are stored"""
+    return re.sub(r'\s+', ' ', str(text)).strip().lower()
+
+def _trigrams(term):
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class _TrieNode:
+    __slots__ = ('children', 'suggestions')
+
+    def __init__(self):
+        self.children = {}
+        self.suggestions = []
+
+class LocationIndex:
+    """Resolves user-typed locations to canonical ones without scanning the data
+
+    A prefix trie answers autocomplete, with each node holding its best
+    completions, and a character trigram index tolerates typos.
+    """
+
+    def __init__(self, location_weights, aliases=None, max_suggestions=10, min_similarity=0.5):
+        """location_weights maps each canonical location to a popularity weight"""
+        self.max_suggestions = max_suggestions
+        self.min_similarity = min_similarity
+        self.weights = dict(location_weights)
+
+        # Every searchable term points at a canonical location
+        self._terms = {location: location for location in self.weights}
+        for alias, target in (LOCATION_ALIASES if aliases is None else aliases).items():
+            if target in self.weights and alias not in self._terms:
+                self._terms[alias] = target
+        self._term_list = list(self._terms)
+
+        self._root = _TrieNode()
+        # Most popular terms first, so each node's suggestions stay sorted
+        for term in sorted(self._term_list, key=lambda t: (-self.weights[self._terms[t]], t)):
+            canonical = self._terms[term]
+            node = self._root
+            for char in term:
+                node = node.children.setdefault(char, _TrieNode())
+                if len(node.suggestions) < max_suggestions and canonical not in node.suggestions:
+                    node.suggestions.append(canonical)
+
+        self._postings = defaultdict(list)
+        self._gram_counts = []
+        for term_id, term in enumerate(self._term_list):
+            grams = _trigrams(term)
+            self._gram_counts.append(len(grams))
+            for gram in grams:
+                self._postings[gram].append(term_id)
+
+        logger.info(f"Indexed {len(self.weights)} locations and {len(self._terms)} search terms")
+
+    def __len__(self):
+        return len(self.weights)
+
+    def complete(self, prefix):
+        """Canonical locations with a term starting with prefix, most popular first"""
+        node = self._root
+        for char in normalize_location(prefix):
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return list(node.suggestions)
+
+    def fuzzy(self, query, limit=None):
+        """Canonical locations ranked by trigram (Dice) similarity to query"""
+        query = normalize_location(query)
+        grams = _trigrams(query)
+        shared = defaultdict(int)
+        for gram in grams:
+            for term_id in self._postings.get(gram, ()):
+                shared[term_id] += 1
+
+        best = {}
+        for term_id, count in shared.items():
+            similarity = 2 * count / (len(grams) + self._gram_counts[term_id])
+            canonical = self._terms[self._term_list[term_id]]
+            if similarity >= self.min_similarity and similarity > best.get(canonical, 0):
+                best[canonical] = similarity
+
+        ranked = sorted(best.items(), key=lambda item: (-item[1], -self.weights[item[0]], item[0]))
+        return ranked[:limit or self.max_suggestions]
+
+    def resolve(self, query):
+        """Best canonical location for query, or None"""
+        query = normalize_location(query)
+        if not query:
+            return None
+        if query in self._terms:
+            return self._terms[query]
+
+        matches = self.fuzzy(query, limit=1)
+        if matches:
+            return matches[0][0]
+
+        # Short unambiguous-enough prefixes, e.g. "koch"
+        if len(query) >= 3:
+            completions = self.complete(query)
+            if completions:
+                return completions[0]
+        return None
+
+    def suggest(self, prefix, limit=None):
+        """Autocomplete suggestions: prefix matches first, then typo-tolerant matches"""
+        limit = min(limit or self.max_suggestions, self.max_suggestions)
+        suggestions = self.complete(prefix)[:limit]
+        if len(suggestions) < limit and len(normalize_location(prefix)) >= 3:
+            for canonical, _ in self.fuzzy(prefix):
+                if canonical not in suggestions:
+                    suggestions.append(canonical)
+                if len(suggestions) >= limit:
+                    break
+        return suggestions
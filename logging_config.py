@@ -0,0 +1,69 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import random
+
+# Fraction of requests whose full payloads are logged at DEBUG
+_payload_sample_rate = 1.0
+
+class ForkSafeQueueHandler(logging.handlers.QueueHandler):
+    """Hands records to a background thread that formats and writes them
+
+    Request threads only enqueue the record; formatting and I/O happen on the
+    listener thread. The listener is (re)started lazily in each process, so
+    handlers configured in a preloading master keep working in forked workers.
+    """
+
+    def __init__(self, *handlers):
+        super().__init__(queue.SimpleQueue())
+        self._target_handlers = handlers
+        self._listener = None
+        self._pid = None
+
+    def prepare(self, record):
+        # Records stay in-process, so skip QueueHandler's eager message formatting
+        return record
+
+    def emit(self, record):
+        # Handler.handle holds self.lock here, so only one thread starts the listener
+        if self._pid != os.getpid():
+            self._start_listener()
+        super().emit(record)
+
+    def _start_listener(self):
+        self.queue = queue.SimpleQueue()
+        self._listener = logging.handlers.QueueListener(
+            self.queue, *self._target_handlers, respect_handler_level=True
+        )
+        self._listener.start()
+        self._pid = os.getpid()
+        atexit.register(self._listener.stop)
+
+def configure_logging(mode=None):
+    """Configure root logging for 'development' (default) or 'production'
+
+    Production logs at INFO through an asynchronous queue handler and samples
+    payload logging at LOG_PAYLOAD_SAMPLE_RATE (default 0).
+    """
+    global _payload_sample_rate
+    mode = (mode or os.environ.get('LOG_MODE', 'development')).lower()
+
+    if mode == 'production':
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(logging.Formatter(
+            '%(asctime)s %(levelname)s [%(process)d] %(name)s: %(message)s'
+        ))
+        root = logging.getLogger()
+        root.handlers[:] = [ForkSafeQueueHandler(stream_handler)]
+        root.setLevel(os.environ.get('LOG_LEVEL', 'INFO').upper())
+        _payload_sample_rate = float(os.environ.get('LOG_PAYLOAD_SAMPLE_RATE', 0.0))
+    else:
+        logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'DEBUG').upper())
+        _payload_sample_rate = float(os.environ.get('LOG_PAYLOAD_SAMPLE_RATE', 1.0))
+
+def should_log_payload(logger):
+    """True when logger emits DEBUG and this request falls in the payload sample"""
+    return (_payload_sample_rate > 0 and logger.isEnabledFor(logging.DEBUG)
+            and (_payload_sample_rate >= 1 or random.random() < _payload_sample_rate))
@@ -0,0 +1,185 @@
+import bisect
+import functools
+import math
+import threading
+import time
+
+# Latency buckets in seconds, from 10us to 2 minutes
+DEFAULT_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, math.inf
+)
+QUANTILES = (0.5, 0.95, 0.99)
+
+class Histogram:
+    """Fixed-bucket latency histogram; observe() is a bisect plus two additions"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def quantile(self, q):
+        """Estimate a quantile by interpolating within its bucket"""
+        with self._lock:
+            counts, total = list(self.counts), self.count
+        if total == 0:
+            return math.nan
+        rank = q * total
+        seen = 0
+        for i, count in enumerate(counts):
+            if seen + count >= rank and count:
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = self.buckets[i]
+                if math.isinf(upper):
+                    return lower
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-2]
+
+class MetricsRegistry:
+    """In-process counters, histograms and callback metrics rendered as Prometheus text"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help = {}
+        self._counters = {}
+        self._histograms = {}
+        self._callbacks = {}
+
+    def describe(self, name, metric_type, help_text):
+        self._help[name] = (metric_type, help_text)
+
+    def inc(self, name, labels=(), amount=1):
+        key = (name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def histogram(self, name, labels=()):
+        key = (name, labels)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram())
+        return histogram
+
+    def observe(self, name, value, labels=()):
+        self.histogram(name, labels).observe(value)
+
+    def register_callback(self, name, metric_type, help_text, callback):
+        """callback() returns {labels: value}; it is evaluated only when rendering"""
+        self.describe(name, metric_type, help_text)
+        self._callbacks[name] = callback
+
+    @staticmethod
+    def _labels(labels, extra=()):
+        pairs = tuple(labels) + tuple(extra)
+        if not pairs:
+            return ''
+        escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"') for _, value in pairs)
+        return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + '}'
+
+    def _header(self, lines, name, default_type, default_help=None):
+        metric_type, help_text = self._help.get(name, (default_type, default_help or name))
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+
+    def render(self):
+        """Prometheus text exposition format"""
+        lines = []
+
+        by_name = {}
+        for (name, labels), value in sorted(self._counters.items()):
+            by_name.setdefault(name, []).append((labels, value))
+        for name, samples in by_name.items():
+            self._header(lines, name, 'counter')
+            for labels, value in samples:
+                lines.append(f"{name}{self._labels(labels)} {value}")
+
+        by_name = {}
+        for (name, labels), histogram in sorted(self._histograms.items()):
+            by_name.setdefault(name, []).append((labels, histogram))
+        for name, samples in by_name.items():
+            self._header(lines, name, 'histogram')
+            for labels, histogram in samples:
+                cumulative = 0
+                for bucket, count in zip(histogram.buckets, list(histogram.counts)):
+                    cumulative += count
+                    le = '+Inf' if math.isinf(bucket) else repr(bucket)
+                    lines.append(f"{name}_bucket{self._labels(labels, (('le', le),))} {cumulative}")
+                lines.append(f"{name}_sum{self._labels(labels)} {histogram.sum}")
+                lines.append(f"{name}_count{self._labels(labels)} {histogram.count}")
+            # Bucket-interpolated percentiles for dashboards without histogram_quantile()
+            quantile_name = f"{name}_quantile"
+            self._header(lines, quantile_name, 'gauge', f"Bucket-estimated quantiles of {name}")
+            for labels, histogram in samples:
+                for q in QUANTILES:
+                    lines.append(f"{quantile_name}{self._labels(labels, (('quantile', q),))} {histogram.quantile(q)}")
+
+        for name, callback in self._callbacks.items():
+            try:
+                samples = callback()
+            except Exception:
+                continue
+            self._header(lines, name, 'gauge')
+            for labels, value in samples.items():
+                lines.append(f"{name}{self._labels(labels)} {value}")
+
+        return '\n'.join(lines) + '\n'
+
+registry = MetricsRegistry()
+registry.describe('smarttrav_stage_seconds', 'histogram', 'Time spent in each pipeline stage')
+
+# Per-thread stage breakdown, only collected while a request is being profiled
+_local = threading.local()
+
+def start_profile():
+    _local.profile = []
+
+def finish_profile():
+    """Return the collected [(stage, seconds)] and stop profiling, or None if not profiling"""
+    profile = getattr(_local, 'profile', None)
+    _local.profile = None
+    return profile
+
+class timed:
+    """Time a block or function as a pipeline stage
+
+    Usable as `with timed('stage'):` or as a `@timed('stage')` decorator.
+    """
+
+    __slots__ = ('stage', 'labels', 'start')
+
+    def __init__(self, stage):
+        self.stage = stage
+        self.labels = (('stage', stage),)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        registry.observe('smarttrav_stage_seconds', elapsed, self.labels)
+        profile = getattr(_local, 'profile', None)
+        if profile is not None:
+            profile.append((self.stage, elapsed))
+        return False
+
+    def __call__(self, func):
+        stage = self.stage
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(stage):
+                return func(*args, **kwargs)
+        return wrapper
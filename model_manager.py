@@ -0,0 +1,179 @@
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class ModelManager:
+    """Owns the live recommender: single-flight loading, readiness and hot reloads
+
+    Reloads build a new recommender in the background and publish it with a
+    single reference assignment. Requests hold on to the recommender they got
+    from get(), so in-flight requests finish on the old version.
+    """
+
+    def __init__(self, loader):
+        """loader is a zero-argument callable that builds and returns a recommender"""
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self.recommender = None
+        self.last_error = None
+        self.loaded_at = None
+        self.load_seconds = None
+        self.version = 0
+        self._listeners = []
+        self._reload_lock = threading.Lock()
+        self._watch_pid = None
+
+    def is_ready(self):
+        return self._ready.is_set()
+
+    def get(self):
+        """Return the recommender, loading it first if needed"""
+        if self._ready.is_set():
+            return self.recommender
+        return self.ensure_loaded()
+
+    def ensure_loaded(self):
+        """Load the recommender exactly once, even under concurrent callers"""
+        with self._lock:
+            # Threads that waited on the lock reuse the result of the first load
+            if self._ready.is_set():
+                return self.recommender
+
+            return self._load()
+
+    def _load(self):
+        """Build a recommender and swap it in; the old one stays live on failure"""
+        start = time.perf_counter()
+        try:
+            recommender = self._loader()
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error(f"Error loading models: {str(e)}")
+            raise
+
+        self.load_seconds = time.perf_counter() - start
+        self.loaded_at = time.time()
+        self.last_error = None
+        self._swap(recommender)
+        logger.info(f"Models version {self.version} ready after {self.load_seconds:.3f}s")
+        return recommender
+
+    def _swap(self, recommender):
+        """Publish a new recommender with one reference flip"""
+        self.recommender = recommender
+        self.version += 1
+        self._ready.set()
+        for listener in self._listeners:
+            try:
+                listener(recommender, self.version)
+            except Exception as e:
+                logger.error(f"Error in model swap listener: {str(e)}")
+
+    def add_listener(self, callback):
+        """Call callback(recommender, version) after every swap, e.g. to drop caches"""
+        self._listeners.append(callback)
+
+    def reload(self, wait=False):
+        """Rebuild the recommender in a background thread and swap it in when done
+
+        Returns False if a reload is already running.
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+
+        def run():
+            try:
+                self._load()
+            except Exception:
+                logger.warning("Reload failed; keeping the current models")
+            finally:
+                self._reload_lock.release()
+
+        thread = threading.Thread(target=run, name='model-reload', daemon=True)
+        thread.start()
+        if wait:
+            thread.join()
+        return True
+
+    def load_in_background(self):
+        """Start loading in a background thread unless ready or a load/reload is running
+
+        Lets readiness probes trigger the first load (or retry a failed one)
+        without blocking. Returns True if a load was started.
+        """
+        if self._ready.is_set() or not self._reload_lock.acquire(blocking=False):
+            return False
+
+        def run():
+            try:
+                # Shares the single-flight guard with loads triggered by requests
+                self.ensure_loaded()
+            except Exception:
+                logger.warning("Background load failed; retrying on the next readiness check")
+            finally:
+                self._reload_lock.release()
+
+        threading.Thread(target=run, name='model-load', daemon=True).start()
+        return True
+
+    def watch(self, paths, interval=5.0):
+        """Poll paths for changes and reload when any of them changes
+
+        Safe to call repeatedly; starts one watcher thread per process, so
+        call it after fork. Returns True if this call started the watcher.
+        """
+        if self._watch_pid == os.getpid():
+            return False
+        self._watch_pid = os.getpid()
+
+        def signature():
+            result = []
+            for path in paths:
+                try:
+                    stat = os.stat(path)
+                    result.append((stat.st_mtime_ns, stat.st_size))
+                except OSError:
+                    result.append(None)
+            return result
+
+        def run():
+            last = signature()
+            while True:
+                time.sleep(interval)
+                current = signature()
+                if current != last:
+                    last = current
+                    logger.info("Data files changed; reloading models")
+                    self.reload(wait=True)
+
+        threading.Thread(target=run, name='model-watch', daemon=True).start()
+        logger.info(f"Watching {len(paths)} data files every {interval}s")
+        return True
+
+    def preload(self):
+        """Load eagerly (e.g. in the master before forking); failures are logged, not raised"""
+        try:
+            self.ensure_loaded()
+        except Exception:
+            logger.warning("Preload failed; models will be loaded on first use or readiness check")
+
+    def status(self):
+        """Readiness details for health endpoints"""
+        status = {
+            'ready': self.is_ready(),
+            'version': self.version,
+            'reloading': self._reload_lock.locked(),
+            'loaded_at': self.loaded_at,
+            'load_seconds': self.load_seconds,
+            'error': self.last_error
+        }
+        if self.is_ready():
+            status['locations'] = {
+                'spots': len(self.recommender.spots_index),
+                'dining': len(self.recommender.dining_index)
+            }
+        return status
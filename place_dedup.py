@@ -0,0 +1,219 @@
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# IDs stay below 2**53 so they survive a round trip through JavaScript numbers
+_ID_MASK = (1 << 53) - 1
+
+def normalize_place_name(name):
+    """Case-, accent- and punctuation-insensitive form of a place name"""
+    text = unicodedata.normalize('NFKD', str(name))
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    text = re.sub(r"['’`]", '', text.casefold())
+    return re.sub(r'[\W_]+', ' ', text).strip()
+
+def place_id(location, key):
+    """Stable integer ID for a canonical (location, name key) pair"""
+    digest = hashlib.blake2b(f"{location}\0{key}".encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') & _ID_MASK
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def _similarity(a, b):
+    """Dice coefficient over character trigrams"""
+    grams_a, grams_b = _trigrams(a), _trigrams(b)
+    return 2 * len(grams_a & grams_b) / (len(grams_a) + len(grams_b))
+
+def _numbers(key):
+    """Numbers in a name key; branches like "cafe 1" and "cafe 2" must never merge"""
+    return tuple(int(digits) for digits in re.findall(r'\d+', key))
+
+def _block_keys(key):
+    # Token prefixes, plus the squashed name for "districtseven" / "district seven"
+    return {token[:4] for token in key.split()} | {'#' + key.replace(' ', '')[:6]}
+
+def _cluster_keys(keys, threshold, max_block_size, known=None):
+    """Map each near-duplicate name key of one location to its cluster's representative
+
+    Keys are visited in sorted order and each joins the most similar
+    existing representative, or starts a new cluster. Matching against
+    representatives only means similar pairs cannot chain distinct places
+    together, and the representative does not depend on review counts.
+    known maps keys clustered by an earlier run to their representatives:
+    those keys keep them, and new keys may join their clusters but never
+    take them over. Candidates come from blocks that share a token prefix;
+    blocks bigger than max_block_size (very common tokens) are skipped.
+
+    >>> _cluster_keys(['cafe restaurant 1', 'cafe restaurant 2', 'cafe resturant 1'], 0.85, 200)
+    {'cafe restaurant 1': 'cafe restaurant 1', 'cafe restaurant 2': 'cafe restaurant 2', 'cafe resturant 1': 'cafe restaurant 1'}
+    >>> _cluster_keys(['chef pilai', 'chef pillai'], 0.85, 200, known={'chef pillai': 'chef pillai'})
+    {'chef pilai': 'chef pillai', 'chef pillai': 'chef pillai'}
+    """
+    known = known or {}
+    blocks = defaultdict(list)
+    for representative in sorted(set(known.values())):
+        for block in _block_keys(representative):
+            blocks[block].append(representative)
+
+    representatives = {}
+    for key in sorted(keys):
+        if key in known:
+            representatives[key] = known[key]
+            continue
+
+        candidates = set()
+        for block in _block_keys(key):
+            if len(blocks[block]) <= max_block_size:
+                candidates.update(blocks[block])
+
+        best, best_similarity = None, threshold
+        for candidate in sorted(candidates):
+            if _numbers(candidate) != _numbers(key):
+                continue
+            similarity = 1.0 if candidate.replace(' ', '') == key.replace(' ', '') else _similarity(candidate, key)
+            if similarity >= best_similarity and (best is None or similarity > best_similarity):
+                best, best_similarity = candidate, similarity
+
+        if best is None:
+            representatives[key] = key
+            for block in _block_keys(key):
+                blocks[block].append(key)
+        else:
+            representatives[key] = best
+    return representatives
+
+class PlaceIdRegistry:
+    """Persistent record of which cluster every name key joined
+
+    Without it the representative of a cluster is its smallest key, so a
+    new spelling that sorts first would move the cluster, and its place_id,
+    onto itself. With it, keys keep the representative they were first
+    given and new spellings can only join existing clusters.
+
+    >>> registry = PlaceIdRegistry(':memory:')
+    >>> first = canonicalize_places(pd.DataFrame({'Place': ['Chef Pillai'], 'Location': ['kochi']}), registry=registry)
+    >>> later = canonicalize_places(pd.DataFrame({'Place': ['Chef Pillai', 'Chef Pilai'], 'Location': ['kochi'] * 2}),
+    ...                             registry=registry)
+    >>> set(later['place_id']) == set(first['place_id'])
+    True
+    """
+
+    def __init__(self, path):
+        """Open (or create) the SQLite registry file at path"""
+        try:
+            self.path = path
+            self._lock = threading.Lock()
+            self._conn = None
+            self._pid = None
+
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            self._connection()
+            logger.info(f"Place ID registry opened at {path}")
+        except Exception as e:
+            logger.error(f"Error opening place ID registry {path}: {str(e)}")
+            raise
+
+    def _connection(self):
+        """Return a connection owned by the current process"""
+        # SQLite connections must not be shared across fork()
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS place_keys (location TEXT NOT NULL, key TEXT NOT NULL, "
+                "representative TEXT NOT NULL, PRIMARY KEY (location, key)) WITHOUT ROWID"
+            )
+            self._pid = os.getpid()
+        return self._conn
+
+    def representatives(self, location):
+        """Return {key: representative} for the keys seen so far in location"""
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT key, representative FROM place_keys WHERE location = ?", (location,)
+            )
+            return dict(rows)
+
+    def record(self, location, representatives):
+        """Store the representatives of new keys; keys already recorded are left alone"""
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO place_keys (location, key, representative) VALUES (?, ?, ?)",
+                    ((location, key, representative) for key, representative in representatives.items())
+                )
+
+def _display_name(variants):
+    """Most frequent spelling; ties prefer capitalized forms, then alphabetical"""
+    return min(variants.items(), key=lambda item: (-item[1], item[0].islower(), item[0]))[0]
+
+def canonicalize_places(df, threshold=0.85, max_block_size=200, weight_column=None, registry=None):
+    """Merge spelling variants of the same place within each location
+
+    Returns a copy of df where Place holds one canonical display name per
+    cluster, plus an integer place_id column. Matching runs once per
+    distinct (location, name) pair, not per review row. Rows count as one
+    review each unless weight_column gives their review counts. IDs only
+    survive new spelling variants across runs when a PlaceIdRegistry is
+    passed as registry.
+    """
+    try:
+        df = df.copy()
+        raw_names = df['Place'].astype(str).str.strip()
+
+        # Distinct (location, spelling) pairs and how many reviews use each
+        codes, pairs = pd.factorize(pd.MultiIndex.from_arrays([df['Location'], raw_names]))
+        weights = df[weight_column].to_numpy(dtype=np.float64) if weight_column else None
+        pair_counts = np.bincount(codes, weights=weights, minlength=len(pairs)).astype(np.int64)
+        pair_locations = pairs.get_level_values(0)
+        pair_names = pairs.get_level_values(1)
+        pair_keys = [normalize_place_name(name) for name in pair_names]
+
+        keys_by_location = defaultdict(set)
+        for location, key in zip(pair_locations, pair_keys):
+            keys_by_location[location].add(key)
+
+        id_by_key = {}
+        for location, keys in keys_by_location.items():
+            # The representative key anchors the ID; the registry keeps it fixed across runs
+            known = registry.representatives(location) if registry is not None else None
+            representatives = _cluster_keys(keys, threshold, max_block_size, known)
+            if registry is not None:
+                registry.record(location, representatives)
+            for key, representative in representatives.items():
+                id_by_key[(location, key)] = place_id(location, representative)
+
+        pair_ids = np.array(
+            [id_by_key[(location, key)] for location, key in zip(pair_locations, pair_keys)],
+            dtype=np.int64
+        )
+
+        variants = defaultdict(Counter)
+        for cluster_id, name, count in zip(pair_ids, pair_names, pair_counts):
+            variants[cluster_id][name] += int(count)
+        display_names = {cluster_id: _display_name(names) for cluster_id, names in variants.items()}
+
+        df['place_id'] = pair_ids[codes]
+        df['Place'] = np.array([display_names[cluster_id] for cluster_id in pair_ids], dtype=object)[codes]
+
+        logger.info(f"Canonicalized {len(pairs)} place spellings into {len(display_names)} places")
+        return df
+
+    except Exception as e:
+        logger.error(f"Error canonicalizing place names: {str(e)}")
+        raise
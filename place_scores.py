@@ -0,0 +1,184 @@
+import time
+import numpy as np
+import pandas as pd
+
+# Methods accepted by confidence_scores() and the ranking engine
+RANKING_METHODS = ('mean', 'bayesian', 'wilson')
+
+# Weight of the prior in the Bayesian average, in reviews
+DEFAULT_PRIOR_WEIGHT = 10
+# z for a 95% Wilson interval
+WILSON_Z = 1.96
+# Default half-life of the decayed score: 180 days
+DEFAULT_HALF_LIFE = 180 * 24 * 3600
+
+def bayesian_average(means, counts, prior_mean, prior_weight=DEFAULT_PRIOR_WEIGHT):
+    """Shrink each mean toward prior_mean as if prior_weight extra reviews had scored prior_mean"""
+    means = np.asarray(means, dtype=np.float64)
+    counts = np.asarray(counts, dtype=np.float64)
+    return (prior_weight * prior_mean + means * counts) / (prior_weight + counts)
+
+def wilson_lower_bound(means, counts, z=WILSON_Z):
+    """Lower bound of the Wilson score interval, treating a [0,1] mean as a success rate"""
+    means = np.clip(np.asarray(means, dtype=np.float64), 0, 1)
+    counts = np.asarray(counts, dtype=np.float64)
+    n = np.maximum(counts, 1)
+    z2 = z * z
+    centre = means + z2 / (2 * n)
+    margin = z * np.sqrt((means * (1 - means) + z2 / (4 * n)) / n)
+    return np.where(counts > 0, (centre - margin) / (1 + z2 / n), 0.0)
+
+def confidence_scores(means, counts, method='mean', prior_mean=None, prior_weight=DEFAULT_PRIOR_WEIGHT):
+    """Scores to rank places by, so one glowing review cannot beat hundreds of good ones
+
+    'mean' ranks by the raw mean, 'bayesian' by a Bayesian average toward
+    prior_mean (default: the review-weighted mean of all places) and
+    'wilson' by the Wilson lower bound.
+    """
+    if method == 'mean':
+        return np.asarray(means, dtype=np.float64)
+    if method == 'bayesian':
+        if prior_mean is None:
+            counts_array = np.asarray(counts, dtype=np.float64)
+            total = counts_array.sum()
+            prior_mean = float(np.dot(means, counts_array) / total) if total > 0 else 0.5
+        return bayesian_average(means, counts, prior_mean, prior_weight)
+    if method == 'wilson':
+        return wilson_lower_bound(means, counts)
+    raise ValueError(f"Unknown ranking method {method!r}, expected one of {RANKING_METHODS}")
+
+class _PlaceAggregate:
+    __slots__ = ('count', 'total', 'total_sq', 'decayed_total', 'decayed_weight', 'updated_at')
+
+    def __init__(self, timestamp):
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.decayed_total = 0.0
+        self.decayed_weight = 0.0
+        self.updated_at = timestamp
+
+class PlaceScores:
+    """Running per-place sentiment aggregates
+
+    Each place keeps its review count, score sum and sum of squares plus an
+    exponentially decayed sum and weight, so adding a review is O(1) and
+    nothing is ever rescanned. half_life is in the same unit as the
+    timestamps (seconds by default). Reviews added without a timestamp are
+    stamped with the current time, so the decayed mean then weighs them by
+    when they were added rather than when they were written.
+
+    These aggregates back SentimentAnalyzer only. The recommender ranks
+    from its PlaceStore, which is rebuilt on reload, and its rankings
+    support RANKING_METHODS but not 'decayed'.
+    """
+
+    def __init__(self, half_life=DEFAULT_HALF_LIFE):
+        self.half_life = half_life
+        self._places = {}
+
+    @classmethod
+    def from_lists(cls, places_dict, **options):
+        """Build from a {place: [scores]} mapping"""
+        place_scores = cls(**options)
+        for place, scores in places_dict.items():
+            if scores:
+                place_scores.add_many([place] * len(scores), scores)
+        return place_scores
+
+    def __len__(self):
+        return len(self._places)
+
+    def __contains__(self, place):
+        return place in self._places
+
+    def clear(self):
+        self._places.clear()
+
+    def _merge(self, place, count, total, total_sq, timestamp):
+        aggregate = self._places.get(place)
+        if aggregate is None:
+            aggregate = self._places[place] = _PlaceAggregate(timestamp)
+
+        # Age the older side to the newer timestamp; late arrivals are discounted instead
+        age = timestamp - aggregate.updated_at
+        if age >= 0:
+            decay = 0.5 ** (age / self.half_life)
+            aggregate.decayed_total *= decay
+            aggregate.decayed_weight *= decay
+            aggregate.updated_at = timestamp
+            weight = 1.0
+        else:
+            weight = 0.5 ** (-age / self.half_life)
+
+        aggregate.count += count
+        aggregate.total += total
+        aggregate.total_sq += total_sq
+        aggregate.decayed_total += weight * total
+        aggregate.decayed_weight += weight * count
+
+    def add(self, place, score, timestamp=None):
+        """Add one review score for place"""
+        score = float(score)
+        self._merge(place, 1, score, score * score, time.time() if timestamp is None else timestamp)
+
+    def add_many(self, places, scores, timestamp=None):
+        """Add a batch of reviews that share one timestamp
+
+        The batch is reduced per place first, so the cost is one merge per
+        distinct place rather than one per review.
+        """
+        scores = np.asarray(scores, dtype=np.float64)
+        if not len(scores):
+            return
+        timestamp = time.time() if timestamp is None else timestamp
+        grouped = pd.DataFrame({'score': scores, 'score_sq': scores * scores}).groupby(
+            np.asarray(places, dtype=object), sort=False
+        )
+        sums = grouped.sum()
+        counts = grouped.size()
+        for place, count, total, total_sq in zip(sums.index, counts.to_numpy(),
+                                                 sums['score'].to_numpy(), sums['score_sq'].to_numpy()):
+            self._merge(place, int(count), float(total), float(total_sq), timestamp)
+
+    def stats(self, place):
+        """Count, mean, variance and decayed mean of one place, or None if unknown"""
+        aggregate = self._places.get(place)
+        if aggregate is None:
+            return None
+        mean = aggregate.total / aggregate.count
+        return {
+            'count': aggregate.count,
+            'mean': mean,
+            'variance': max(aggregate.total_sq / aggregate.count - mean * mean, 0.0),
+            'decayed_mean': aggregate.decayed_total / aggregate.decayed_weight if aggregate.decayed_weight else mean
+        }
+
+    def top(self, n=3, method='mean', prior_weight=DEFAULT_PRIOR_WEIGHT):
+        """The n best places as [{'name', 'sentiment_score', 'review_count', 'rank_score'}]
+
+        method is one of RANKING_METHODS, or 'decayed' to rank by the
+        time-decayed mean. Ties keep insertion order.
+        """
+        if not self._places:
+            return []
+        names = list(self._places)
+        aggregates = self._places.values()
+        counts = np.fromiter((a.count for a in aggregates), dtype=np.float64, count=len(names))
+        means = np.fromiter((a.total for a in aggregates), dtype=np.float64, count=len(names)) / counts
+
+        if method == 'decayed':
+            rank_scores = np.fromiter(
+                (a.decayed_total / a.decayed_weight if a.decayed_weight else a.total / a.count for a in aggregates),
+                dtype=np.float64, count=len(names)
+            )
+        else:
+            rank_scores = confidence_scores(means, counts, method, prior_weight=prior_weight)
+
+        order = np.argsort(-rank_scores, kind='stable')[:n]
+        return [{
+            'name': names[i],
+            'sentiment_score': float(means[i]),
+            'review_count': int(counts[i]),
+            'rank_score': float(rank_scores[i])
+        } for i in order]
@@ -0,0 +1,227 @@
+import logging
+import numpy as np
+import pandas as pd
+from metrics import timed
+
+logger = logging.getLogger(__name__)
+
+def coordinate_aggregates(df):
+    """Per-row lat_sum, lon_sum and coord_count columns for from_aggregates
+
+    Rows without valid Latitude/Longitude values contribute nothing, so a
+    place's coordinates are the mean of the rows that have them.
+    """
+    if 'Latitude' not in df.columns or 'Longitude' not in df.columns:
+        zeros = np.zeros(len(df))
+        return {'lat_sum': zeros, 'lon_sum': zeros, 'coord_count': zeros}
+    latitudes = pd.to_numeric(df['Latitude'], errors='coerce').to_numpy(dtype=np.float64)
+    longitudes = pd.to_numeric(df['Longitude'], errors='coerce').to_numpy(dtype=np.float64)
+    valid = (np.abs(latitudes) <= 90) & (np.abs(longitudes) <= 180)
+    return {
+        'lat_sum': np.where(valid, latitudes, 0.0),
+        'lon_sum': np.where(valid, longitudes, 0.0),
+        'coord_count': valid.astype(np.float64)
+    }
+
+class StringTable:
+    """Immutable list of strings packed into one UTF-8 buffer plus an offsets array"""
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    @classmethod
+    def from_strings(cls, strings):
+        """Pack an iterable of strings"""
+        encoded = [str(s).encode('utf-8') for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return cls(blob, offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        # Decoded on access; only the strings a request returns are materialized
+        return bytes(self.blob[self.offsets[i]:self.offsets[i + 1]]).decode('utf-8')
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    @property
+    def nbytes(self):
+        return self.blob.nbytes + self.offsets.nbytes
+
+class PlaceStore:
+    """Columnar, one-row-per-place store for a single category
+
+    Rows are ordered by location and then place ID, so each location owns a
+    contiguous row range. Only one representative review is kept per place.
+    """
+
+    def __init__(self, category, locations, location_offsets, place_ids, names, scores, review_counts, reviews,
+                 latitudes=None, longitudes=None):
+        self.category = category
+        self.locations = locations                # StringTable of location names, sorted
+        self.location_offsets = location_offsets  # int64, rows of location i are [off[i], off[i+1])
+        self.place_ids = place_ids                # int64 stable place ID per row
+        self.names = names                        # StringTable, one display name per row
+        self.scores = scores                      # float32 mean sentiment per row
+        self.review_counts = review_counts        # int32 number of reviews per row
+        self.reviews = reviews                    # StringTable, representative review per row
+        # float64 mean coordinates per row, NaN where the input had none; float32 would
+        # only resolve ~1 m and turn 76.24 into 76.239998
+        self.latitudes = latitudes if latitudes is not None else np.full(len(scores), np.nan, dtype=np.float64)
+        self.longitudes = longitudes if longitudes is not None else np.full(len(scores), np.nan, dtype=np.float64)
+        self._location_codes = {location: code for code, location in enumerate(locations)}
+
+    @classmethod
+    def from_dataframe(cls, df, category):
+        """Collapse scored review rows (Location, place_id, Place, Review, sentiment_score) into places
+
+        Optional Latitude/Longitude columns are averaged per place.
+        """
+        scores = np.nan_to_num(df['sentiment_score'].to_numpy(dtype=np.float64), nan=0.5)
+        return cls.from_aggregates(
+            df.assign(review_count=1, score_sum=scores, **coordinate_aggregates(df)), category
+        )
+
+    @classmethod
+    @timed('build_index')
+    def from_aggregates(cls, df, category):
+        """Collapse partial per-place aggregates into places
+
+        df has Location, place_id, Place, Review, review_count and score_sum
+        columns; several rows may belong to one place and are summed. The
+        first row of each place provides its representative review. Optional
+        lat_sum, lon_sum and coord_count columns give each place its mean
+        coordinates.
+        """
+        try:
+            location_codes, locations = pd.factorize(df['Location'], sort=True)
+            id_codes, ids = pd.factorize(df['place_id'], sort=True)
+
+            # One key per (location, place ID); sorted keys group rows by location
+            keys = location_codes.astype(np.int64) * max(len(ids), 1) + id_codes
+            place_keys, first_rows, row_places = np.unique(keys, return_index=True, return_inverse=True)
+
+            review_counts = np.bincount(
+                row_places, weights=df['review_count'].to_numpy(dtype=np.float64), minlength=len(place_keys)
+            )
+            score_sums = np.bincount(
+                row_places, weights=df['score_sum'].to_numpy(dtype=np.float64), minlength=len(place_keys)
+            )
+
+            if 'coord_count' in df.columns:
+                coord_counts = np.bincount(
+                    row_places, weights=df['coord_count'].to_numpy(dtype=np.float64), minlength=len(place_keys)
+                )
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    latitudes = np.bincount(
+                        row_places, weights=df['lat_sum'].to_numpy(dtype=np.float64), minlength=len(place_keys)
+                    ) / coord_counts
+                    longitudes = np.bincount(
+                        row_places, weights=df['lon_sum'].to_numpy(dtype=np.float64), minlength=len(place_keys)
+                    ) / coord_counts
+            else:
+                latitudes = longitudes = np.full(len(place_keys), np.nan)
+
+            place_locations = place_keys // max(len(ids), 1)
+            location_offsets = np.searchsorted(
+                place_locations, np.arange(len(locations) + 1)
+            ).astype(np.int64)
+
+            reviews = df['Review'].fillna("No review available").to_numpy(dtype=object)
+
+            store = cls(
+                category=category,
+                locations=StringTable.from_strings(locations),
+                location_offsets=location_offsets,
+                place_ids=np.asarray(ids, dtype=np.int64)[place_keys % max(len(ids), 1)],
+                names=StringTable.from_strings(df['Place'].to_numpy(dtype=object)[first_rows]),
+                scores=(score_sums / np.maximum(review_counts, 1)).astype(np.float32),
+                review_counts=review_counts.astype(np.int32),
+                reviews=StringTable.from_strings(reviews[first_rows]),
+                latitudes=latitudes.astype(np.float64),
+                longitudes=longitudes.astype(np.float64)
+            )
+            logger.info(f"Built {category} store: {len(store)} places, "
+                        f"{len(store.locations)} locations, {store.nbytes} bytes")
+            return store
+
+        except Exception as e:
+            logger.error(f"Error building {category} place store: {str(e)}")
+            raise
+
+    # Array fields written to and loaded from snapshots
+    ARRAY_FIELDS = ('location_offsets', 'place_ids', 'scores', 'review_counts', 'latitudes', 'longitudes')
+    TABLE_FIELDS = ('locations', 'names', 'reviews')
+
+    def to_arrays(self):
+        """Flatten the store into a {name: ndarray} mapping"""
+        arrays = {field: getattr(self, field) for field in self.ARRAY_FIELDS}
+        for field in self.TABLE_FIELDS:
+            table = getattr(self, field)
+            arrays[f"{field}_blob"] = table.blob
+            arrays[f"{field}_offsets"] = table.offsets
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, category, arrays):
+        """Rebuild a store from to_arrays() output, e.g. memory-mapped snapshot arrays"""
+        fields = {field: arrays[field] for field in cls.ARRAY_FIELDS}
+        for field in cls.TABLE_FIELDS:
+            fields[field] = StringTable(arrays[f"{field}_blob"], arrays[f"{field}_offsets"])
+        return cls(category=category, **fields)
+
+    def __len__(self):
+        return len(self.scores)
+
+    @property
+    def nbytes(self):
+        """Approximate memory held by the store's arrays"""
+        return (self.locations.nbytes + self.location_offsets.nbytes + self.place_ids.nbytes + self.names.nbytes
+                + self.scores.nbytes + self.review_counts.nbytes + self.reviews.nbytes
+                + self.latitudes.nbytes + self.longitudes.nbytes)
+
+    def location_code(self, location):
+        """Code of a location, or None if it is not in the store"""
+        return self._location_codes.get(location)
+
+    def location_rows(self, code):
+        """Row range of one location"""
+        return range(int(self.location_offsets[code]), int(self.location_offsets[code + 1]))
+
+    def rows_for(self, locations, place_ids):
+        """Row of each (location, place ID) pair, or -1 where the place is unknown"""
+        codes = pd.Series(locations).map(self._location_codes).fillna(-1).to_numpy(dtype=np.int64)
+        place_ids = np.asarray(place_ids, dtype=np.int64)
+        rows = np.full(len(codes), -1, dtype=np.int64)
+
+        # Place IDs ascend within each location's row range, so each lookup is a binary search
+        order = np.argsort(codes, kind='stable')
+        boundaries = np.flatnonzero(np.diff(codes[order])) + 1
+        for group in np.split(order, boundaries):
+            code = codes[group[0]] if len(group) else -1
+            if code < 0:
+                continue
+            start, end = int(self.location_offsets[code]), int(self.location_offsets[code + 1])
+            ids = self.place_ids[start:end]
+            positions = np.minimum(np.searchsorted(ids, place_ids[group]), max(len(ids) - 1, 0))
+            found = ids[positions] == place_ids[group] if len(ids) else np.zeros(len(group), dtype=bool)
+            rows[group] = np.where(found, start + positions, -1)
+        return rows
+
+    def record(self, row):
+        """Materialize one place as a recommendation record"""
+        location = self.locations[int(np.searchsorted(self.location_offsets, row, side='right')) - 1]
+        return {
+            'place_id': int(self.place_ids[row]),
+            'name': self.names[row],
+            'location': location,
+            'sentiment_score': float(self.scores[row]),
+            'review': self.reviews[row],
+            'latitude': float(self.latitudes[row]) if np.isfinite(self.latitudes[row]) else None,
+            'longitude': float(self.longitudes[row]) if np.isfinite(self.longitudes[row]) else None
+        }
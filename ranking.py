@@ -0,0 +1,145 @@
+import heapq
+import logging
+import numpy as np
+from place_store import PlaceStore
+from place_scores import confidence_scores
+from text_index import TextIndex
+
+# Share of the keyword search score that comes from sentiment; the rest is BM25 relevance
+TEXT_SENTIMENT_WEIGHT = 0.3
+
+logger = logging.getLogger(__name__)
+
+class RankingEngine:
+    """Per-location place rankings built with heap-based partial sorts"""
+
+    def __init__(self, store, depth=20, top_rows=None, top_offsets=None, ranking='mean', text_index=None):
+        """Rank each location's places once, keeping the top `depth` rows ready to slice
+
+        ranking is 'mean', or 'bayesian'/'wilson' to rank by a score adjusted
+        for review count. top_rows/top_offsets restore rankings saved by
+        to_arrays() without re-ranking. text_index enables keyword search.
+        """
+        self.store = store
+        self.text_index = text_index
+        self.depth = depth
+        self.ranking = ranking
+        self._rank_scores = (
+            store.scores if ranking == 'mean' else confidence_scores(store.scores, store.review_counts, ranking)
+        )
+        if top_rows is None:
+            scores = self._rank_scores
+            # heapq.nlargest costs O(n log depth) per location instead of a full sort
+            ranked = [
+                heapq.nlargest(depth, store.location_rows(code), key=scores.__getitem__)
+                for code in range(len(store.locations))
+            ]
+            top_offsets = np.zeros(len(ranked) + 1, dtype=np.int64)
+            np.cumsum([len(rows) for rows in ranked], out=top_offsets[1:])
+            top_rows = np.fromiter(
+                (row for rows in ranked for row in rows), dtype=np.int32, count=int(top_offsets[-1])
+            )
+            logger.info(f"Ranked {len(store)} {store.category} places across {len(self)} locations")
+        self._top_rows = top_rows
+        self._top_offsets = top_offsets
+        # Full per-location orders, sorted on first deep access and then reused
+        self._full_orders = {}
+
+    @classmethod
+    def from_dataframe(cls, df, category, depth=20, ranking='mean'):
+        """Build rankings and a text index from review rows with Location, Place, Review and sentiment_score"""
+        store = PlaceStore.from_dataframe(df, category)
+        return cls(store, depth, ranking=ranking, text_index=TextIndex.from_reviews(store, df))
+
+    def to_arrays(self):
+        """Flatten the store and its rankings into a {name: ndarray} mapping"""
+        arrays = self.store.to_arrays()
+        arrays['top_rows'] = self._top_rows
+        arrays['top_offsets'] = self._top_offsets
+        if self.text_index is not None:
+            arrays.update(self.text_index.to_arrays())
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, category, arrays, depth, ranking='mean'):
+        """Restore rankings saved with to_arrays()"""
+        store = PlaceStore.from_arrays(category, arrays)
+        return cls(store, depth, top_rows=arrays['top_rows'], top_offsets=arrays['top_offsets'], ranking=ranking,
+                   text_index=TextIndex.from_arrays(arrays))
+
+    def __contains__(self, location):
+        return self.store.location_code(location) is not None
+
+    def __len__(self):
+        return len(self.store.locations)
+
+    def locations(self):
+        """All ranked locations"""
+        return iter(self.store.locations)
+
+    def top(self, location, n):
+        """Return the n best places for location, best first"""
+        code = self.store.location_code(location)
+        if code is None:
+            return []
+        if n <= self.depth:
+            rows = self._top_rows[self._top_offsets[code]:self._top_offsets[code + 1]][:n]
+        else:
+            # Deeper than the precomputed prefix
+            rows = self._full_order(code)[:n]
+        return [self.store.record(row) for row in rows]
+
+    def _full_order(self, code):
+        """Every row of a location, best first, in the same order as the precomputed prefix"""
+        order = self._full_orders.get(code)
+        if order is None:
+            rows = self.store.location_rows(code)
+            # Stable sort: equal scores keep row order, as heapq.nlargest does
+            order = rows.start + np.argsort(-self._rank_scores[rows.start:rows.stop], kind='stable')
+            self._full_orders[code] = order
+        return order
+
+    def page(self, location, offset, limit):
+        """Return (records, total) for places offset..offset+limit-1 of location, best first
+
+        Pages inside the precomputed prefix are slices of it. Deeper pages use
+        the location's full order, sorted once on first use, so every later
+        page costs O(limit).
+        """
+        code = self.store.location_code(location)
+        if code is None:
+            return [], 0
+        total = len(self.store.location_rows(code))
+        end = min(offset + limit, total)
+        if offset >= end:
+            return [], total
+        if end <= self.depth:
+            rows = self._top_rows[self._top_offsets[code] + offset:self._top_offsets[code] + end]
+        else:
+            rows = self._full_order(code)[offset:end]
+        return [self.store.record(row) for row in rows], total
+
+    def search(self, location, query, n):
+        """Return the n places in location whose reviews best match query
+
+        Places are ranked by BM25 relevance, scaled to [0, 1] within the
+        results and blended with sentiment by TEXT_SENTIMENT_WEIGHT.
+        """
+        code = self.store.location_code(location)
+        if code is None or self.text_index is None:
+            return []
+        rows = self.store.location_rows(code)
+        rows, relevance = self.text_index.search(query, rows.start, rows.stop)
+        if not len(rows):
+            return []
+
+        relevance = relevance / relevance.max()
+        combined = (1 - TEXT_SENTIMENT_WEIGHT) * relevance + TEXT_SENTIMENT_WEIGHT * self.store.scores[rows]
+        best = np.argsort(-combined, kind='stable')[:n]
+
+        records = []
+        for i in best:
+            record = self.store.record(rows[i])
+            record['relevance'] = round(float(relevance[i]), 4)
+            records.append(record)
+        return records
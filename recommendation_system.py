@@ -2,24 +2,49 @@
 import pandas as pd
 import numpy as np
 import logging
+from ranking import RankingEngine
+from place_store import PlaceStore
+from location_index import LocationIndex
+from geo_index import GeoIndex
+from text_index import TextIndex
+from place_dedup import canonicalize_places
+from metrics import timed
 
 logger = logging.getLogger(__name__)
 
 class TourismRecommender:
-    def __init__(self, dining_df, spots_df, sentiment_analyzer):
-        """Initialize with separate dataframes for dining and spots"""
+    def __init__(self, dining_df, spots_df, sentiment_analyzer, ranking_depth=20, ranking='mean',
+                 place_registry=None):
+        """Initialize with separate dataframes for dining and spots
+
+        ranking is 'mean', 'bayesian' or 'wilson'; the latter two keep a place
+        with a single glowing review from outranking one with hundreds.
+        place_registry (a PlaceIdRegistry) keeps place IDs fixed across rebuilds.
+        """
         try:
             logger.info("Initializing TourismRecommender...")
             logger.info(f"Dining DataFrame shape: {dining_df.shape}")
             logger.info(f"Spots DataFrame shape: {spots_df.shape}")
             
-            self.dining_df = self._clean_dataframe(dining_df)
-            self.spots_df = self._clean_dataframe(spots_df)
+            dining_df = self._clean_dataframe(dining_df, place_registry=place_registry)
+            spots_df = self._clean_dataframe(spots_df, place_registry=place_registry)
             self.sentiment_analyzer = sentiment_analyzer
             
+            # Score both categories in one pass so parallel workers see a single batch
+            dining_scores, spots_scores = self.sentiment_analyzer.score_review_columns(
+                [dining_df['Review'], spots_df['Review']]
+            )
+            
             # Process both dataframes
-            self.dining_df = self._process_dataframe(self.dining_df, 'dining')
-            self.spots_df = self._process_dataframe(self.spots_df, 'spot')
+            dining_df = self._process_dataframe(dining_df, 'dining', dining_scores)
+            spots_df = self._process_dataframe(spots_df, 'spot', spots_scores)
+            
+            # Precompute per-location rankings over compact columnar stores;
+            # the review DataFrames are not kept once these are built
+            self.dining_index = RankingEngine.from_dataframe(dining_df, 'dining', ranking_depth, ranking)
+            self.spots_index = RankingEngine.from_dataframe(spots_df, 'spot', ranking_depth, ranking)
+            self.location_index = self._build_location_index()
+            self.dining_geo_index = self._build_geo_index()
             
             logger.info("TourismRecommender initialized successfully")
             
@@ -27,7 +52,86 @@ class TourismRecommender:
             logger.error(f"Error initializing TourismRecommender: {str(e)}")
             raise
 
-    def _clean_dataframe(self, df):
+    @classmethod
+    def from_snapshot(cls, path):
+        """Load prebuilt, memory-mapped indexes written by `snapshot.py build`
+
+        No CSV parsing or sentiment scoring happens here.
+        """
+        from snapshot import load_snapshot
+
+        manifest, indexes = load_snapshot(path)
+        recommender = cls.__new__(cls)
+        recommender.sentiment_analyzer = None
+        recommender.snapshot_manifest = manifest
+        recommender.dining_index = indexes['dining']
+        recommender.spots_index = indexes['spot']
+        recommender.location_index = recommender._build_location_index()
+        recommender.dining_geo_index = recommender._build_geo_index()
+        return recommender
+
+    def _build_location_index(self):
+        """Index all known locations, weighted by how many places they have"""
+        weights = {}
+        for index in (self.dining_index, self.spots_index):
+            store = index.store
+            counts = np.diff(store.location_offsets)
+            for location, count in zip(store.locations, counts):
+                weights[location] = weights.get(location, 0) + int(count)
+        return LocationIndex(weights)
+
+    def _build_geo_index(self):
+        """Spatial index over dining places that have coordinates"""
+        store = self.dining_index.store
+        return GeoIndex(store.latitudes, store.longitudes)
+
+    @classmethod
+    def from_aggregates(cls, dining_aggregates, spots_aggregates, ranking_depth=20, ranking='mean',
+                        dining_terms=None, spots_terms=None, place_registry=None):
+        """Build from per-place running aggregates produced by streaming_ingest
+
+        Each frame has Location, Place, review_count, score_sum, best_score and
+        Review (the best-scored review) columns. The optional term frames have
+        Location, Place, term and count columns and enable keyword search.
+        """
+        try:
+            recommender = cls.__new__(cls)
+            recommender.sentiment_analyzer = None
+            indexes = []
+            for category, aggregates, terms in (('dining', dining_aggregates, dining_terms),
+                                                ('spot', spots_aggregates, spots_terms)):
+                raw_names = aggregates['Place']
+                # Spelling variants from different chunks are merged here, weighted by review count
+                aggregates = canonicalize_places(aggregates, weight_column='review_count', registry=place_registry)
+                # Best review first, so each place keeps its best review as representative
+                aggregates = aggregates.sort_values('best_score', ascending=False, kind='stable')
+                store = PlaceStore.from_aggregates(aggregates, category)
+
+                text_index = None
+                if terms is not None:
+                    # Term counts are keyed by the ingested spelling; map them to canonical places
+                    place_ids = pd.DataFrame({
+                        'Location': aggregates['Location'], 'Place': raw_names.loc[aggregates.index],
+                        'place_id': aggregates['place_id']
+                    }).drop_duplicates(['Location', 'Place'])
+                    terms = terms.merge(place_ids, on=['Location', 'Place'], how='inner')
+                    text_index = TextIndex.from_term_counts(
+                        store.rows_for(terms['Location'], terms['place_id']), terms['term'], terms['count'],
+                        len(store)
+                    )
+                indexes.append(RankingEngine(store, ranking_depth, ranking=ranking, text_index=text_index))
+            recommender.dining_index, recommender.spots_index = indexes
+            recommender.location_index = recommender._build_location_index()
+            recommender.dining_geo_index = recommender._build_geo_index()
+            return recommender
+
+        except Exception as e:
+            logger.error(f"Error building recommender from aggregates: {str(e)}")
+            raise
+
+    @staticmethod
+    @timed('clean_dataframe')
+    def _clean_dataframe(df, canonicalize=True, place_registry=None):
         """Clean and prepare dataframe"""
         try:
             logger.info(f"Original DataFrame columns: {df.columns.tolist()}")
@@ -45,7 +149,12 @@ class TourismRecommender:
                 'address': 'Location',
                 'review': 'Review',
                 'reviews': 'Review',
-                'comment': 'Review'
+                'comment': 'Review',
+                'latitude': 'Latitude',
+                'lat': 'Latitude',
+                'longitude': 'Longitude',
+                'lon': 'Longitude',
+                'lng': 'Longitude'
             }
             
             # Convert column names to lowercase for case-insensitive mapping
@@ -92,8 +201,12 @@ class TourismRecommender:
             # Standardize location names (convert to lowercase)
             df['Location'] = df['Location'].str.lower().str.strip()
             
+            # Merge spelling variants of the same place and assign stable place IDs
+            if canonicalize:
+                df = canonicalize_places(df, registry=place_registry)
+            
             logger.info(f"Final DataFrame columns: {df.columns.tolist()}")
-            logger.info(f"Sample data:\n{df.head()}")
+            logger.debug("Sample data:\n%s", df.head())
             
             return df
             
@@ -101,24 +214,15 @@ class TourismRecommender:
             logger.error(f"Error cleaning dataframe: {str(e)}")
             raise
 
-    def _process_dataframe(self, df, category):
+    def _process_dataframe(self, df, category, scores=None):
         """Process dataframe to add sentiment scores and type"""
         try:
             logger.debug(f"Processing {category} dataframe with columns: {df.columns.tolist()}")
             
-            # Get top places based on sentiment analysis
-            top_places = self.sentiment_analyzer.analyze_reviews(df)
-            
-            # Create a set of top place names for filtering
-            top_place_names = {place['name'] for place in top_places}
-            
-            # Filter dataframe to include only top places
-            df_filtered = df[df['Place'].isin(top_place_names)].copy()
-            
-            # Add sentiment scores and category type
-            for place in top_places:
-                mask = df_filtered['Place'] == place['name']
-                df_filtered.loc[mask, 'sentiment_score'] = place['sentiment_score']
+            # Keep every review with its own score; rankings average them per place
+            if scores is None:
+                scores = self.sentiment_analyzer.score_reviews(df['Review'])
+            df_filtered = df.assign(sentiment_score=scores)
             
             df_filtered['type'] = category
             
@@ -129,27 +233,25 @@ class TourismRecommender:
             logger.error(f"Error processing {category} dataframe: {str(e)}")
             raise
 
-    def get_recommendations(self, search_location, top_n=3):
-        """Get recommendations based on location and sentiment scores"""
+    @timed('recommend')
+    def get_recommendations(self, search_location, top_n=3, dining_top_n=None):
+        """Get recommendations based on location and sentiment scores
+
+        dining_top_n overrides top_n for dining spots.
+        """
         try:
-            # Standardize search location
-            search_location = search_location.lower().strip()
-            logger.info(f"Getting recommendations for location: {search_location}")
-            
-            # Debug location matching
-            logger.debug(f"Available locations in spots: {self.spots_df['Location'].unique()}")
-            logger.debug(f"Available locations in dining: {self.dining_df['Location'].unique()}")
+            # Resolve typos, prefixes and aliases to a canonical location
+            search_location = self.location_index.resolve(search_location) or search_location.lower().strip()
+            logger.debug("Getting recommendations for location: %s", search_location)
             
-            # Filter places by location
-            tourist_places_df = self.spots_df[self.spots_df['Location'] == search_location]
-            dining_spots_df = self.dining_df[self.dining_df['Location'] == search_location]
+            # Look up the precomputed rankings for this location
+            tourist_places = self.spots_index.top(search_location, top_n)
+            dining_spots = self.dining_index.top(search_location, top_n if dining_top_n is None else dining_top_n)
             
-            logger.info(f"Found {len(tourist_places_df)} tourist places and {len(dining_spots_df)} dining spots")
-            
-            tourist_places = self._get_top_recommendations(tourist_places_df, top_n)
-            dining_spots = self._get_top_recommendations(dining_spots_df, top_n)
+            logger.debug("Found %d tourist places and %d dining spots", len(tourist_places), len(dining_spots))
             
             recommendations = {
+                'location': search_location,
                 'tourist_places': tourist_places,
                 'dining_spots': dining_spots
             }
@@ -157,75 +259,112 @@ class TourismRecommender:
             return recommendations
 
         except Exception as e:
-            logger.error(f"Error generating recommendations: {str(e)}")
-            return {'tourist_places': [], 'dining_spots': []}
-
-    def _get_top_recommendations(self, df, top_n):
-        """Get top recommendations from a dataframe based on sentiment scores"""
-        recommendations = []
-        seen_places = set()  # Track seen places
-        
+            logger.error("Error generating recommendations: %s", e)
+            return {'location': search_location, 'tourist_places': [], 'dining_spots': []}
+
+    @timed('recommend_nearby')
+    def get_nearby_recommendations(self, search_location, top_n=3, dining_top_n=3, radius_km=2.0):
+        """Get recommendations where each tourist place carries the best-scored dining within radius_km
+
+        Dining is paired by distance rather than by city name, so a restaurant
+        in a neighbouring locality still matches a spot across the street.
+        Places without coordinates get an empty nearby_dining list.
+        """
+        return self.attach_nearby_dining(
+            self.get_recommendations(search_location, top_n, dining_top_n), dining_top_n, radius_km
+        )
+
+    def attach_nearby_dining(self, recommendations, dining_top_n=3, radius_km=2.0):
+        """Add a nearby_dining list to every tourist place in recommendations"""
+        store = self.dining_index.store
+        for place in recommendations['tourist_places']:
+            place['nearby_dining'] = []
+            if place['latitude'] is None:
+                continue
+            rows, distances = self.dining_geo_index.within(place['latitude'], place['longitude'], radius_km)
+            # Rows come nearest first and the sort is stable, so the closer place wins a tie
+            for i in np.argsort(-store.scores[rows], kind='stable')[:dining_top_n]:
+                record = store.record(rows[i])
+                record['distance_km'] = round(float(distances[i]), 3)
+                place['nearby_dining'].append(record)
+        return recommendations
+
+    @timed('keyword_search')
+    def search_reviews(self, search_location, query, top_n=3, dining_top_n=None):
+        """Get places in a location whose reviews match a keyword query, e.g. "sunset view"
+
+        Answered from the inverted review index; returns the same shape as
+        get_recommendations with a relevance value on every place.
+        """
         try:
-            # Group by Place and calculate average sentiment score
-            place_groups = df.groupby('Place').agg({
-                'sentiment_score': 'mean',
-                'Location': 'first',
-                'Review': 'first'
-            }).reset_index()
-            
-            # Sort by sentiment score
-            place_groups = place_groups.sort_values('sentiment_score', ascending=False)
-            
-            # Get unique recommendations
-            for _, row in place_groups.iterrows():
-                place_name = row['Place']
-                
-                # Skip if we've already seen this place
-                if place_name in seen_places:
-                    continue
-                    
-                recommendations.append({
-                    'name': place_name,
-                    'location': row['Location'],
-                    'sentiment_score': row['sentiment_score'],
-                    'review': row['Review'] if pd.notnull(row['Review']) else "No review available"
-                })
-                
-                seen_places.add(place_name)
-                
-                # Break if we have enough unique recommendations
-                if len(recommendations) >= top_n:
-                    break
-                
-            # If we don't have enough recommendations, try to get more with lower scores
-            if len(recommendations) < top_n:
-                remaining_places = df[~df['Place'].isin(seen_places)].drop_duplicates('Place')
-                for _, row in remaining_places.iterrows():
-                    if len(recommendations) >= top_n:
-                        break
-                        
-                    recommendations.append({
-                        'name': row['Place'],
-                        'location': row['Location'],
-                        'sentiment_score': row.get('sentiment_score', 0.5),
-                        'review': row['Review'] if pd.notnull(row['Review']) else "No review available"
-                    })
-                    seen_places.add(row['Place'])
-                    
+            search_location = self.location_index.resolve(search_location) or search_location.lower().strip()
+            logger.debug("Searching reviews in %s for %r", search_location, query)
+            return {
+                'location': search_location,
+                'tourist_places': self.spots_index.search(search_location, query, top_n),
+                'dining_spots': self.dining_index.search(
+                    search_location, query, top_n if dining_top_n is None else dining_top_n
+                )
+            }
+
         except Exception as e:
-            logger.error(f"Error getting top recommendations: {str(e)}")
-            
-        return recommendations[:top_n]  # Ensure we return exactly top_n recommendations
+            logger.error("Error searching reviews: %s", e)
+            return {'location': search_location, 'tourist_places': [], 'dining_spots': []}
+
+    def get_ranked_page(self, search_location, offset=0, limit=10, categories=('spot', 'dining')):
+        """Get one page of each category's ranking for a location
+
+        Returns {'location': ..., 'pages': {category: (records, total)}}.
+        """
+        search_location = self.location_index.resolve(search_location) or search_location.lower().strip()
+        indexes = {'spot': self.spots_index, 'dining': self.dining_index}
+        return {
+            'location': search_location,
+            'pages': {category: indexes[category].page(search_location, offset, limit) for category in categories}
+        }
+
+    def get_batch_recommendations(self, search_locations, top_n=3, dining_top_n=None):
+        """Get recommendations for several locations in one pass
+
+        Returns one result per query, in order. Queries that resolve to the
+        same canonical location share a single lookup.
+        """
+        results = {}
+        batch = []
+        for query in search_locations:
+            location = self.location_index.resolve(query) or str(query).lower().strip()
+            if location not in results:
+                results[location] = self.get_recommendations(location, top_n, dining_top_n)
+            batch.append((query, results[location]))
+        return batch
 
     def format_recommendations(self, recommendations):
         """Format recommendations for API response"""
-        return [{
-            'name': rec['name'],
-            'location': rec['location'].title(),  # Capitalize location name
-            'sentiment_score': round(rec['sentiment_score'], 2),  # Round to 2 decimal places
-            'rating': self._sentiment_to_rating(rec['sentiment_score']),  # Convert sentiment to rating
-            'sample_review': rec['review']
-        } for rec in recommendations]
+        formatted = []
+        for rec in recommendations:
+            item = {
+                'id': rec['place_id'],
+                'name': rec['name'],
+                'location': rec['location'].title(),  # Capitalize location name
+                'sentiment_score': round(rec['sentiment_score'], 2),  # Round to 2 decimal places
+                'rating': self._sentiment_to_rating(rec['sentiment_score']),  # Convert sentiment to rating
+                'sample_review': rec['review'],
+                'latitude': self._round_coordinate(rec['latitude']),
+                'longitude': self._round_coordinate(rec['longitude'])
+            }
+            # Present only in nearby and keyword modes
+            if 'relevance' in rec:
+                item['relevance'] = rec['relevance']
+            if 'distance_km' in rec:
+                item['distance_km'] = rec['distance_km']
+            if 'nearby_dining' in rec:
+                item['nearby_dining'] = self.format_recommendations(rec['nearby_dining'])
+            formatted.append(item)
+        return formatted
+
+    def _round_coordinate(self, value):
+        """Round a stored float64 coordinate to ~0.1 m, keeping None for unknown"""
+        return None if value is None else round(value, 6)
 
     def _sentiment_to_rating(self, sentiment_score):
         """Convert sentiment score to a 5-star rating"""
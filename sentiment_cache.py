@@ -0,0 +1,95 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+class SentimentCache:
+    """Persistent score cache keyed by a hash of the normalized review text and analyzer version"""
+
+    # Keep IN (...) lists under SQLite's bound-parameter limit
+    BATCH_SIZE = 500
+
+    def __init__(self, path, version):
+        """Open (or create) the SQLite cache file at path"""
+        try:
+            self.path = path
+            self.version = version
+            self.hits = 0
+            self.misses = 0
+            self._lock = threading.Lock()
+            self._conn = None
+            self._pid = None
+
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            self._connection()
+            logger.info(f"Sentiment cache opened at {path}")
+        except Exception as e:
+            logger.error(f"Error opening sentiment cache {path}: {str(e)}")
+            raise
+
+    def _connection(self):
+        """Return a connection owned by the current process"""
+        # SQLite connections must not be shared across fork()
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS scores (key BLOB PRIMARY KEY, score REAL NOT NULL) WITHOUT ROWID"
+            )
+            self._pid = os.getpid()
+        return self._conn
+
+    @staticmethod
+    def normalize(text):
+        """Collapse whitespace; VADER tokenizes on whitespace so scores are unaffected"""
+        return " ".join(text.split())
+
+    def make_key(self, text):
+        """Content hash of the normalized text for the current analyzer version"""
+        payload = f"{self.version}\0{self.normalize(text)}".encode('utf-8')
+        return hashlib.blake2b(payload, digest_size=16).digest()
+
+    def get_many(self, keys):
+        """Return {key: score} for the keys present in the cache"""
+        found = {}
+        keys = list(keys)
+        with self._lock:
+            conn = self._connection()
+            for i in range(0, len(keys), self.BATCH_SIZE):
+                batch = keys[i:i + self.BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(f"SELECT key, score FROM scores WHERE key IN ({placeholders})", batch)
+                found.update(rows)
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items):
+        """Store (key, score) pairs"""
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO scores (key, score) VALUES (?, ?)", items)
+
+    def stats(self):
+        """Hit/miss counters for this process"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0
+        }
+
+    def close(self):
+        """Close the underlying connection"""
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
@@ -1,19 +1,80 @@
-import nltk
-from nltk.sentiment import SentimentIntensityAnalyzer
+import hashlib
+import json
 import logging
-from collections import defaultdict
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from sentiment_cache import SentimentCache
+from place_scores import PlaceScores
+from metrics import timed
+from vader_lexicon import load_analyzer
 
 logger = logging.getLogger(__name__)
 
+# Bump when the scoring formula changes so cached scores are invalidated
+SCORER_VERSION = 1
+
+# 'vader' uses vaderSentiment with the bundled lexicon; 'nltk' reproduces scores from NLTK's port
+SENTIMENT_BACKENDS = ('vader', 'nltk')
+
+# Per-process analyzer used by parallel scoring workers
+_worker_sia = None
+
+def _normalized_score(sia, text):
+    """Score a single text and map the VADER compound score to [0,1]"""
+    if not isinstance(text, str):
+        return 0.5  # Neutral sentiment for non-string input
+    return (sia.polarity_scores(text)['compound'] + 1) / 2
+
+def _create_analyzer(backend):
+    """Return (VADER analyzer, version string) for a backend"""
+    if backend == 'vader':
+        sia, version = load_analyzer()
+        return sia, f"vader-{version}-v{SCORER_VERSION}"
+    if backend == 'nltk':
+        # Deferred: NLTK is slow to import and needs its lexicon downloaded
+        import nltk
+        from nltk.sentiment import SentimentIntensityAnalyzer
+
+        nltk.download('vader_lexicon', quiet=True)
+        sia = SentimentIntensityAnalyzer()
+        lexicon = json.dumps(sorted(sia.lexicon.items())).encode('utf-8')
+        lexicon_hash = hashlib.sha1(lexicon).hexdigest()[:16]
+        return sia, f"vader-nltk-{nltk.__version__}-{lexicon_hash}-v{SCORER_VERSION}"
+    raise ValueError(f"Unknown sentiment backend {backend!r}, expected one of {SENTIMENT_BACKENDS}")
+
+def _init_worker(backend):
+    """Create the VADER analyzer once in each worker process"""
+    global _worker_sia
+    _worker_sia, _ = _create_analyzer(backend)
+
+def _score_chunk(texts):
+    """Score one shard of review texts inside a worker process"""
+    return np.fromiter(
+        (_normalized_score(_worker_sia, text) for text in texts),
+        dtype=np.float64,
+        count=len(texts)
+    )
+
 class SentimentAnalyzer:
-    def __init__(self):
-        """Initialize the VADER sentiment analyzer"""
+    def __init__(self, workers=1, chunk_size=5000, cache_path=None, backend='vader'):
+        """Initialize the VADER sentiment analyzer
+
+        The default backend loads a bundled lexicon and works offline.
+
+        With workers > 1, batches larger than chunk_size are sharded across a
+        process pool. Results are identical to the serial path.
+        With cache_path set, scores are persisted in a SQLite cache so unchanged
+        reviews are not rescored after a restart.
+        """
         try:
-            # Download required NLTK data
-            nltk.download('vader_lexicon', quiet=True)
-            self.sia = SentimentIntensityAnalyzer()
-            # Initialize dictionaries to store unique place sentiments
-            self.place_sentiments = defaultdict(list)
+            self.backend = backend
+            self.sia, self.version = _create_analyzer(backend)
+            self.workers = max(1, int(workers))
+            self.chunk_size = max(1, int(chunk_size))
+            self.cache = SentimentCache(cache_path, self.version) if cache_path else None
+            # Running per-place aggregates of the reviews seen by this analyzer
+            self.place_sentiments = PlaceScores()
             logger.info("Sentiment analyzer initialized successfully")
         except Exception as e:
             logger.error(f"Error initializing sentiment analyzer: {str(e)}")
@@ -24,16 +85,12 @@ class SentimentAnalyzer:
         try:
             if not isinstance(text, str):
                 return 0.5  # Return neutral sentiment for non-string input
-            
-            # Get sentiment scores
-            scores = self.sia.polarity_scores(text)
-            
-            # Convert compound score to range [0,1]
-            normalized_score = (scores['compound'] + 1) / 2
-            
+
+            normalized_score = self._normalized_score(text)
+
             # Store sentiment score for the place if place_name is provided
             if place_name:
-                self.place_sentiments[place_name].append(normalized_score)
+                self.place_sentiments.add(place_name, normalized_score)
             
             return normalized_score
             
@@ -41,36 +98,126 @@ class SentimentAnalyzer:
             logger.error(f"Error predicting sentiment: {str(e)}")
             return 0.5  # Return neutral sentiment on error
 
-    def get_top_places(self, places_dict, n=3):
-        """Get top n places based on average sentiment scores"""
+    def _normalized_score(self, text):
+        """Score a single text and map the VADER compound score to [0,1]"""
+        return _normalized_score(self.sia, text)
+
+    def cache_stats(self):
+        """Cache hit/miss counts, or None when caching is disabled"""
+        return self.cache.stats() if self.cache is not None else None
+
+    def _score_cached(self, texts):
+        """Score distinct texts, reusing persisted scores and only computing the misses"""
+        if self.cache is None:
+            return self._score_texts(texts)
+
+        keys = [self.cache.make_key(text) if isinstance(text, str) else None for text in texts]
+        cached = self.cache.get_many(key for key in keys if key is not None)
+
+        scores = np.empty(len(texts), dtype=np.float64)
+        missing = []
+        for i, key in enumerate(keys):
+            score = cached.get(key) if key is not None else None
+            if score is None:
+                missing.append(i)
+            else:
+                scores[i] = score
+
+        if missing:
+            missing = np.asarray(missing)
+            new_scores = self._score_texts(texts[missing])
+            scores[missing] = new_scores
+            self.cache.put_many(
+                (keys[i], float(score)) for i, score in zip(missing, new_scores) if keys[i] is not None
+            )
+
+        logger.info(f"Sentiment cache: {len(texts) - len(missing)} hits, {len(missing)} misses")
+        return scores
+
+    def _score_texts(self, texts):
+        """Score distinct texts, sharding them across worker processes when enabled"""
+        if self.workers == 1 or len(texts) <= self.chunk_size:
+            return np.fromiter(
+                (self._normalized_score(text) for text in texts),
+                dtype=np.float64,
+                count=len(texts)
+            )
+
+        chunks = [texts[i:i + self.chunk_size] for i in range(0, len(texts), self.chunk_size)]
+        logger.info(f"Scoring {len(texts)} reviews in {len(chunks)} chunks on {self.workers} workers")
+
+        # map() yields results in submission order, so the merge is deterministic
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(self.backend,)) as executor:
+            return np.concatenate(list(executor.map(_score_chunk, chunks)))
+
+    def score_reviews(self, reviews):
+        """Score a whole column of reviews and return normalized scores as a NumPy array"""
+        return self.score_review_columns([reviews])[0]
+
+    @timed('sentiment_scoring')
+    def score_review_columns(self, columns):
+        """Score several review columns in one pass and return one score array per column"""
         try:
-            # Calculate average sentiment for each place
-            place_averages = {}
-            for place, scores in places_dict.items():
-                if scores:  # Only include places with sentiment scores
-                    avg_sentiment = sum(scores) / len(scores)
-                    place_averages[place] = avg_sentiment
-
-            # Sort places by sentiment score and get top n
-            sorted_places = sorted(place_averages.items(), 
-                                 key=lambda x: x[1], 
-                                 reverse=True)
-            
-            # Return top n unique places
-            top_places = []
-            seen_places = set()
-            
-            for place, score in sorted_places:
-                if place not in seen_places:
-                    top_places.append({
-                        'name': place,
-                        'sentiment_score': score
-                    })
-                    seen_places.add(place)
-                    if len(top_places) == n:
-                        break
-            
-            return top_places
+            columns = [pd.Series(column, copy=False) for column in columns]
+            lengths = [len(column) for column in columns]
+            if sum(lengths) == 0:
+                return [np.full(length, 0.5, dtype=np.float64) for length in lengths]
+
+            # Score each distinct review text only once across all columns
+            codes, unique_reviews = pd.factorize(
+                pd.concat(columns, ignore_index=True) if len(columns) > 1 else columns[0]
+            )
+            unique_scores = self._score_cached(np.asarray(unique_reviews, dtype=object))
+
+            scores = np.full(len(codes), 0.5, dtype=np.float64)
+            valid = codes >= 0
+            scores[valid] = unique_scores[codes[valid]]
+
+            return np.split(scores, np.cumsum(lengths)[:-1])
+
+        except Exception as e:
+            logger.error(f"Error scoring reviews: {str(e)}")
+            raise
+
+    def _valid_place_scores(self, reviews_df, scores=None):
+        """Place names and review scores of the rows that have both"""
+        if 'Place' not in reviews_df.columns or 'Review' not in reviews_df.columns:
+            return np.empty(0, dtype=object), np.empty(0, dtype=np.float64)
+
+        places = reviews_df['Place']
+        reviews = reviews_df['Review']
+
+        # Only rows with both a place name and a review are scored
+        valid = (places.notna() & reviews.notna() & (places != '') & (reviews != '')).to_numpy()
+        if scores is None:
+            scores = self.score_reviews(reviews)
+        return places[valid].to_numpy(), np.asarray(scores)[valid]
+
+    def add_reviews(self, reviews_df, scores=None, timestamp=None):
+        """Fold a batch of new reviews into the running per-place aggregates"""
+        try:
+            places, scores = self._valid_place_scores(reviews_df, scores)
+            self.place_sentiments.add_many(places, scores, timestamp)
+        except Exception as e:
+            logger.error(f"Error adding reviews: {str(e)}")
+            raise
+
+    def get_top_places(self, places_dict=None, n=3, method='mean'):
+        """Get top n places based on sentiment scores
+
+        Ranks the running aggregates by default; places_dict may also be a
+        PlaceScores (such as place_sentiments) or a {place: [scores]} mapping.
+        method is 'mean', 'bayesian', 'wilson' or 'decayed'.
+        """
+        try:
+            if places_dict is None:
+                places = self.place_sentiments
+            elif isinstance(places_dict, PlaceScores):
+                places = places_dict
+            else:
+                places = PlaceScores.from_lists(places_dict)
+            return places.top(n, method)
 
         except Exception as e:
             logger.error(f"Error getting top places: {str(e)}")
@@ -80,22 +227,16 @@ class SentimentAnalyzer:
         """Reset stored sentiments"""
         self.place_sentiments.clear()
 
-    def analyze_reviews(self, reviews_df):
-        """Analyze multiple reviews and return top places"""
+    def analyze_reviews(self, reviews_df, scores=None, method='mean'):
+        """Analyze multiple reviews and return top places
+
+        The batch is folded into place_sentiments, so earlier batches keep
+        counting; call reset_sentiments() first to rank this batch alone.
+        """
         try:
-            # Reset previous sentiments
-            self.reset_sentiments()
-            
-            # Process each review
-            for _, row in reviews_df.iterrows():
-                place_name = row.get('Place')
-                review_text = row.get('Review')
-                
-                if place_name and review_text:
-                    self.predict_sentiment(str(review_text), place_name)
-            
-            # Get top places
-            return self.get_top_places(self.place_sentiments)
+            # Score all reviews in one batch and aggregate them per place
+            self.add_reviews(reviews_df, scores)
+            return self.place_sentiments.top(3, method)
             
         except Exception as e:
             logger.error(f"Error analyzing reviews: {str(e)}")
@@ -0,0 +1,168 @@
+import argparse
+import json
+import logging
+import os
+import shutil
+import time
+import numpy as np
+import pandas as pd
+from place_scores import RANKING_METHODS
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the on-disk layout changes
+SNAPSHOT_FORMAT_VERSION = 3
+MANIFEST_NAME = 'manifest.json'
+CATEGORIES = ('dining', 'spot')
+
+def save_snapshot(recommender, path, analyzer_version=None):
+    """Write the recommender's indexes as .npy arrays plus a manifest
+
+    The snapshot is written next to path and renamed into place, so readers
+    never see a partial snapshot.
+    """
+    try:
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        if os.path.exists(tmp_path):
+            shutil.rmtree(tmp_path)
+        os.makedirs(tmp_path)
+
+        manifest = {
+            'format_version': SNAPSHOT_FORMAT_VERSION,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'analyzer_version': analyzer_version,
+            'categories': {}
+        }
+
+        for category, index in zip(CATEGORIES, (recommender.dining_index, recommender.spots_index)):
+            arrays = index.to_arrays()
+            for name, array in arrays.items():
+                np.save(os.path.join(tmp_path, f"{category}.{name}.npy"), np.ascontiguousarray(array))
+            manifest['categories'][category] = {
+                'depth': index.depth,
+                'ranking': index.ranking,
+                'places': len(index.store),
+                'locations': len(index),
+                'arrays': sorted(arrays)
+            }
+
+        with open(os.path.join(tmp_path, MANIFEST_NAME), 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        # Swap the finished snapshot into place
+        old_path = None
+        if os.path.exists(path):
+            old_path = f"{path}.old-{os.getpid()}"
+            os.rename(path, old_path)
+        os.rename(tmp_path, path)
+        if old_path:
+            shutil.rmtree(old_path)
+
+        logger.info(f"Snapshot written to {path}")
+        return manifest
+
+    except Exception as e:
+        logger.error(f"Error writing snapshot {path}: {str(e)}")
+        raise
+
+def load_snapshot(path):
+    """Memory-map a snapshot and return (manifest, {category: RankingEngine})"""
+    from ranking import RankingEngine
+
+    try:
+        with open(os.path.join(path, MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+
+        if manifest.get('format_version') != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported snapshot format {manifest.get('format_version')}, "
+                f"expected {SNAPSHOT_FORMAT_VERSION}"
+            )
+
+        indexes = {}
+        for category, info in manifest['categories'].items():
+            # mmap_mode='r' shares the pages between every process that loads the file
+            arrays = {
+                name: np.load(os.path.join(path, f"{category}.{name}.npy"), mmap_mode='r')
+                for name in info['arrays']
+            }
+            indexes[category] = RankingEngine.from_arrays(
+                category, arrays, info['depth'], info.get('ranking', 'mean')
+            )
+
+        logger.info(f"Loaded snapshot {path} created at {manifest.get('created_at')}")
+        return manifest, indexes
+
+    except Exception as e:
+        logger.error(f"Error loading snapshot {path}: {str(e)}")
+        raise
+
+def build_snapshot(dining_path, spots_path, output_path, clean=False, chunksize=None, ranking='mean',
+                   place_ids_path=None, **analyzer_options):
+    """Run the full load, clean, score and rank pipeline and save the result
+
+    With chunksize set, inputs are cleaned and ingested in bounded chunks.
+    With place_ids_path set, place IDs are kept stable through a PlaceIdRegistry.
+    """
+    from clean_csv import clean_csv_file, clean_csv_file_chunked
+    from sentiment_model import SentimentAnalyzer
+    from recommendation_system import TourismRecommender
+    from streaming_ingest import build_recommender
+    from place_dedup import PlaceIdRegistry
+
+    if clean:
+        cleaned = []
+        for raw_path in (dining_path, spots_path):
+            cleaned_path = raw_path.replace('.csv', '_cleaned.csv')
+            if chunksize:
+                result = clean_csv_file_chunked(raw_path, cleaned_path, chunksize)
+            else:
+                result = clean_csv_file(raw_path, cleaned_path)
+            if result is None:
+                raise ValueError(f"Could not clean {raw_path}")
+            cleaned.append(cleaned_path)
+        dining_path, spots_path = cleaned
+
+    analyzer = SentimentAnalyzer(**analyzer_options)
+    registry = PlaceIdRegistry(place_ids_path) if place_ids_path else None
+    if chunksize:
+        recommender = build_recommender(dining_path, spots_path, analyzer, chunksize, ranking=ranking,
+                                        place_registry=registry)
+    else:
+        dining_df = pd.read_csv(dining_path)
+        spots_df = pd.read_csv(spots_path)
+        recommender = TourismRecommender(dining_df, spots_df, analyzer, ranking=ranking, place_registry=registry)
+    return save_snapshot(recommender, output_path, analyzer.version)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build SmartTrav recommendation snapshots")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help="Score the CSVs and write a snapshot")
+    build.add_argument('--dining', default='data/Dining_cleaned.csv')
+    build.add_argument('--spots', default='data/Spots_cleaned.csv')
+    build.add_argument('--output', default='data/snapshot')
+    build.add_argument('--clean', action='store_true', help="Inputs are raw CSVs; run clean_csv first")
+    build.add_argument('--chunksize', type=int, default=None,
+                       help="Stream inputs in chunks of this many rows (for files larger than memory)")
+    build.add_argument('--ranking', choices=RANKING_METHODS, default='mean',
+                       help="Rank by raw mean or by a review-count-adjusted score")
+    build.add_argument('--backend', choices=('vader', 'nltk'), default='vader',
+                       help="Sentiment scorer; 'nltk' reproduces scores from NLTK's VADER port")
+    build.add_argument('--workers', type=int, default=1)
+    build.add_argument('--cache-path', default='data/sentiment_cache.sqlite')
+    build.add_argument('--place-ids', default='data/place_ids.sqlite',
+                       help="Registry that keeps place IDs stable across builds; empty to disable")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == 'build':
+        manifest = build_snapshot(
+            args.dining, args.spots, args.output, clean=args.clean, chunksize=args.chunksize, ranking=args.ranking,
+            place_ids_path=args.place_ids or None, workers=args.workers, cache_path=args.cache_path or None, backend=args.backend
+        )
+        print(json.dumps(manifest, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -26,13 +26,9 @@ document.addEventListener('DOMContentLoaded', () => {
         const location = document.querySelector('#location').value;
         
         try {
-            const response = await fetch('/search', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({ location: location }),
-            });
+            // GET so the browser and CDN can reuse cached results (ETag/Cache-Control)
+            const params = new URLSearchParams({ location: location });
+            const response = await fetch(`/search?${params}`);
 
             const data = await response.json();
             
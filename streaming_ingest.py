@@ -0,0 +1,92 @@
+import logging
+import pandas as pd
+from check_data import validate_dataframe
+from clean_csv import clean_dataframe
+from place_store import coordinate_aggregates
+from text_index import term_counts, fold_term_counts
+from recommendation_system import TourismRecommender
+
+logger = logging.getLogger(__name__)
+
+AGGREGATE_COLUMNS = ['Location', 'Place', 'review_count', 'score_sum', 'best_score', 'Review',
+                     'lat_sum', 'lon_sum', 'coord_count']
+
+def fold_aggregates(aggregates, rows):
+    """Merge partial per-place aggregates into the running totals
+
+    Both frames have AGGREGATE_COLUMNS. The result has one row per
+    (Location, Place) and keeps the highest-scored review seen so far.
+    """
+    combined = rows if aggregates is None else pd.concat([aggregates, rows], ignore_index=True)
+    # Stable sort: on equal scores the earlier review wins, keeping results deterministic
+    combined = combined.sort_values('best_score', ascending=False, kind='stable')
+    return combined.groupby(['Location', 'Place'], sort=False).agg(
+        review_count=('review_count', 'sum'),
+        score_sum=('score_sum', 'sum'),
+        best_score=('best_score', 'first'),
+        Review=('Review', 'first'),
+        lat_sum=('lat_sum', 'sum'),
+        lon_sum=('lon_sum', 'sum'),
+        coord_count=('coord_count', 'sum')
+    ).reset_index()
+
+def stream_aggregates(path, sentiment_analyzer, chunksize=100000, skiprows=0):
+    """Read, clean, validate and score a CSV in bounded chunks
+
+    Only the running per-place aggregates (count, score sum, best review) are
+    kept between chunks, so peak memory is set by chunksize and the number of
+    distinct places, not by the size of the file.
+    """
+    return stream_place_data(path, sentiment_analyzer, chunksize, skiprows, index_text=False)[0]
+
+def stream_place_data(path, sentiment_analyzer, chunksize=100000, skiprows=0, index_text=True):
+    """Like stream_aggregates, also returning per-place review term counts for keyword search
+
+    Returns (aggregates, terms). terms grows with the number of distinct
+    (place, term) pairs, and is None when index_text is False.
+    """
+    try:
+        aggregates = None
+        terms = None
+        rows = 0
+        empty_counts = None
+
+        for chunk in pd.read_csv(path, chunksize=chunksize, skiprows=skiprows):
+            chunk = clean_dataframe(chunk)
+            _, chunk_empty = validate_dataframe(chunk)
+            empty_counts = chunk_empty if empty_counts is None else empty_counts.add(chunk_empty, fill_value=0)
+
+            chunk = TourismRecommender._clean_dataframe(chunk, canonicalize=False)
+            scores = sentiment_analyzer.score_reviews(chunk['Review'])
+            chunk = chunk.assign(review_count=1, score_sum=scores, best_score=scores, **coordinate_aggregates(chunk))
+
+            aggregates = fold_aggregates(aggregates, chunk[AGGREGATE_COLUMNS])
+            if index_text:
+                terms = fold_term_counts(terms, term_counts(chunk[['Location', 'Place']], chunk['Review']))
+            rows += len(chunk)
+            logger.debug(f"Ingested {rows} rows from {path}, {len(aggregates)} places so far")
+
+        if empty_counts is not None:
+            for col, count in empty_counts.items():
+                if count > 0:
+                    logger.warning(f"Column '{col}' in {path} has {int(count)} empty values")
+
+        logger.info(f"Streamed {rows} rows from {path} into {0 if aggregates is None else len(aggregates)} places")
+        if aggregates is None:
+            aggregates = pd.DataFrame(columns=AGGREGATE_COLUMNS)
+        if index_text and terms is None:
+            terms = pd.DataFrame(columns=['Location', 'Place', 'term', 'count'])
+        return aggregates, terms
+
+    except Exception as e:
+        logger.error(f"Error streaming {path}: {str(e)}")
+        raise
+
+def build_recommender(dining_path, spots_path, sentiment_analyzer, chunksize=100000, ranking_depth=20, ranking='mean',
+                      place_registry=None):
+    """Build a TourismRecommender from CSVs of any size"""
+    dining_aggregates, dining_terms = stream_place_data(dining_path, sentiment_analyzer, chunksize)
+    spots_aggregates, spots_terms = stream_place_data(spots_path, sentiment_analyzer, chunksize)
+    return TourismRecommender.from_aggregates(
+        dining_aggregates, spots_aggregates, ranking_depth, ranking, dining_terms, spots_terms, place_registry
+    )
@@ -0,0 +1,101 @@
+import argparse
+import logging
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+_SYLLABLES = ['ko', 'chi', 'tri', 'van', 'drum', 'zhi', 'kode', 'ala', 'pu', 'zha', 'mun', 'nar', 'thek', 'ady',
+              'var', 'kal', 'ku', 'mar', 'atti', 'pal', 'ka', 'dan', 'ser', 'ry', 'ban', 'ga', 'lore']
+_PLACE_WORDS = ['Cafe', 'Spice', 'Garden', 'Paragon', 'Harbour', 'Villa', 'Lotus', 'Coconut', 'Pepper', 'Salt',
+                'Jade', 'Palace', 'Backwater', 'Sunset', 'Fort', 'Beach', 'Hill', 'Temple', 'Market', 'Lagoon']
+_PLACE_KINDS = ['Restaurant', 'Kitchen', 'House', 'Point', 'View', 'Bistro', 'Grill', 'Park', 'Museum', 'Lake']
+_PHRASES = [
+    "The food was absolutely delicious", "Service was slow and the staff seemed rude",
+    "Great ambience and friendly staff", "Overpriced for what you get", "A must visit when in town",
+    "The view at sunset is stunning", "Portions were small and bland", "Clean, calm and well maintained",
+    "Terrible experience, would not recommend", "Decent place for a quick bite", "Loved the seafood curry",
+    "Parking was a nightmare", "Wonderful hospitality and quick service", "The place was crowded and noisy",
+    "Nothing special but not bad either", "Best biryani I have had in years", "Worth every penny",
+    "Disappointing compared to the reviews", "Kids enjoyed it a lot", "Beautiful architecture and history"
+]
+
+def _zipf_weights(n, exponent):
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+def _location_names(n, rng):
+    names = set()
+    while len(names) < n:
+        names.add(''.join(rng.choice(_SYLLABLES, size=rng.integers(2, 4))).title())
+    return sorted(names)
+
+def generate_reviews(n_reviews, n_locations=None, places_per_location=None, skew=1.1,
+                     variant_rate=0.05, seed=0, chunk_size=1000000):
+    """Yield DataFrames shaped like data/Dining_cleaned.csv (Place, Location, Review)
+
+    Locations and places within a location follow Zipf-like popularity, so a
+    few cities and venues receive most of the reviews. A fraction of rows use
+    spelling variants of the place name, as in the real data. Chunks keep
+    memory bounded for 10^7-row datasets.
+    """
+    rng = np.random.default_rng(seed)
+    n_locations = n_locations or max(3, int(n_reviews ** 0.4))
+    places_per_location = places_per_location or max(5, int(n_reviews ** 0.5 / 2))
+
+    locations = _location_names(n_locations, rng)
+    location_weights = _zipf_weights(n_locations, skew)
+    place_weights = _zipf_weights(places_per_location, skew)
+    place_names = np.array([
+        f"{rng.choice(_PLACE_WORDS)} {rng.choice(_PLACE_KINDS)} {i}" for i in range(places_per_location)
+    ], dtype=object)
+    phrases = np.array(_PHRASES, dtype=object)
+
+    generated = 0
+    while generated < n_reviews:
+        size = min(chunk_size, n_reviews - generated)
+        location_idx = rng.choice(n_locations, size=size, p=location_weights)
+        place_idx = rng.choice(places_per_location, size=size, p=place_weights)
+
+        places = place_names[place_idx].copy()
+        variants = rng.random(size) < variant_rate
+        places[variants] = [name.lower() for name in places[variants]]
+
+        # Two or three phrases plus a visit number keep most review texts distinct
+        first, second, third = (rng.integers(0, len(phrases), size=size) for _ in range(3))
+        has_third = rng.random(size) < 0.5
+        reviews = [
+            f"{phrases[a]}. {phrases[b]}." + (f" {phrases[c]}." if extra else "") + f" Visit {generated + i}."
+            for i, (a, b, c, extra) in enumerate(zip(first, second, third, has_third))
+        ]
+
+        yield pd.DataFrame({
+            'Place': places,
+            'Location': np.asarray(locations, dtype=object)[location_idx],
+            'Review': reviews
+        })
+        generated += size
+
+def generate_dataframe(n_reviews, **options):
+    """Whole synthetic dataset as one DataFrame"""
+    return pd.concat(generate_reviews(n_reviews, **options), ignore_index=True)
+
+def write_csv(path, n_reviews, **options):
+    """Stream a synthetic dataset to a CSV file"""
+    for chunk_number, chunk in enumerate(generate_reviews(n_reviews, **options)):
+        chunk.to_csv(path, index=False, mode='w' if chunk_number == 0 else 'a', header=chunk_number == 0)
+    logger.info(f"Wrote {n_reviews} synthetic reviews to {path}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic SmartTrav review datasets")
+    parser.add_argument('output')
+    parser.add_argument('--reviews', type=int, default=100000)
+    parser.add_argument('--locations', type=int, default=None)
+    parser.add_argument('--places-per-location', type=int, default=None)
+    parser.add_argument('--skew', type=float, default=1.1)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    write_csv(args.output, args.reviews, n_locations=args.locations,
+              places_per_location=args.places_per_location, skew=args.skew, seed=args.seed)
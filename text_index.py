@@ -0,0 +1,149 @@
+import bisect
+import logging
+import math
+import re
+import numpy as np
+import pandas as pd
+from place_store import StringTable
+from metrics import timed
+
+logger = logging.getLogger(__name__)
+
+# Runs of letters and digits in any script
+TOKEN_PATTERN = r"[^\W_]+"
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from had has have i in is it its my of on or our so that the "
+    "their there they this to was we were will with".split()
+)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+def tokenize(text):
+    """Lowercased word tokens of text without stopwords"""
+    return [token for token in re.findall(TOKEN_PATTERN, str(text).lower()) if token not in STOPWORDS]
+
+def term_counts(keys, texts):
+    """Count every term per key over a column of review texts
+
+    keys is a DataFrame of key columns aligned with texts. Returns the key
+    columns plus term and count, one row per (key, term).
+    """
+    keys = keys.reset_index(drop=True)
+    tokens = (
+        pd.Series(np.asarray(texts, dtype=object)).fillna('').astype(str)
+        .str.lower().str.findall(TOKEN_PATTERN).explode()
+    )
+    tokens = tokens[tokens.notna() & ~tokens.isin(STOPWORDS)]
+    counts = keys.iloc[tokens.index.to_numpy()].reset_index(drop=True).assign(term=tokens.to_numpy())
+    return counts.groupby(list(keys.columns) + ['term'], sort=False).size().rename('count').reset_index()
+
+def fold_term_counts(counts, rows):
+    """Merge partial term counts into the running totals"""
+    if counts is None:
+        return rows
+    columns = [column for column in rows.columns if column != 'count']
+    return pd.concat([counts, rows], ignore_index=True).groupby(columns, sort=False)['count'].sum().reset_index()
+
+class TextIndex:
+    """Inverted index from review terms to place rows, scored with BM25
+
+    Each term owns a slice of the postings array holding the store rows that
+    mention it, in ascending order, with matching term frequencies. Since
+    each location owns a contiguous row range, restricting a term to one
+    location is a binary search on its postings.
+    """
+
+    def __init__(self, terms, term_offsets, postings, frequencies, doc_lengths):
+        self.terms = terms                  # StringTable, sorted vocabulary
+        self.term_offsets = term_offsets    # int64, postings of term i are [off[i], off[i+1])
+        self.postings = postings            # int32 store rows
+        self.frequencies = frequencies      # int32 occurrences of the term in each posting row
+        self.doc_lengths = doc_lengths      # int32 indexed tokens per store row
+        self.documents = int(np.count_nonzero(doc_lengths))
+        self.average_length = float(doc_lengths.sum()) / max(self.documents, 1)
+
+    @classmethod
+    @timed('build_text_index')
+    def from_term_counts(cls, rows, terms, counts, row_count):
+        """Build from (store row, term, count) triples; rows of -1 are skipped"""
+        rows = np.asarray(rows, dtype=np.int64)
+        valid = rows >= 0
+        rows = rows[valid]
+        counts = np.asarray(counts, dtype=np.int64)[valid]
+        term_codes, vocabulary = pd.factorize(np.asarray(terms, dtype=object)[valid], sort=True)
+
+        # Sorting (term, row) keys lays postings out term by term in row order
+        keys, inverse = np.unique(term_codes.astype(np.int64) * max(row_count, 1) + rows, return_inverse=True)
+        frequencies = np.bincount(inverse, weights=counts, minlength=len(keys))
+        key_terms = keys // max(row_count, 1)
+
+        index = cls(
+            terms=StringTable.from_strings(vocabulary),
+            term_offsets=np.searchsorted(key_terms, np.arange(len(vocabulary) + 1)).astype(np.int64),
+            postings=(keys % max(row_count, 1)).astype(np.int32),
+            frequencies=frequencies.astype(np.int32),
+            doc_lengths=np.bincount(rows, weights=counts, minlength=row_count).astype(np.int32)
+        )
+        logger.info(f"Built text index: {len(vocabulary)} terms, {len(keys)} postings")
+        return index
+
+    @classmethod
+    def from_reviews(cls, store, df):
+        """Index the Review column of scored rows that have Location and place_id"""
+        counts = term_counts(df[['Location', 'place_id']], df['Review'])
+        rows = store.rows_for(counts['Location'], counts['place_id'])
+        return cls.from_term_counts(rows, counts['term'], counts['count'], len(store))
+
+    # Array names used in snapshots, without the 'text_' prefix
+    ARRAY_FIELDS = ('term_offsets', 'postings', 'frequencies', 'doc_lengths')
+
+    def to_arrays(self):
+        """Flatten the index into a {name: ndarray} mapping"""
+        arrays = {f"text_{field}": getattr(self, field) for field in self.ARRAY_FIELDS}
+        arrays['text_terms_blob'] = self.terms.blob
+        arrays['text_terms_offsets'] = self.terms.offsets
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Rebuild an index from to_arrays() output, or None if the arrays have no index"""
+        if 'text_postings' not in arrays:
+            return None
+        fields = {field: arrays[f"text_{field}"] for field in cls.ARRAY_FIELDS}
+        return cls(terms=StringTable(arrays['text_terms_blob'], arrays['text_terms_offsets']), **fields)
+
+    @property
+    def nbytes(self):
+        return (self.terms.nbytes + self.term_offsets.nbytes + self.postings.nbytes
+                + self.frequencies.nbytes + self.doc_lengths.nbytes)
+
+    def _term_id(self, term):
+        # Binary search over the sorted vocabulary; nothing is decoded up front
+        i = bisect.bisect_left(self.terms, term)
+        return i if i < len(self.terms) and self.terms[i] == term else None
+
+    def search(self, query, start=0, end=None):
+        """BM25 scores of the rows in [start, end) matching any query term, as (rows, scores)"""
+        end = len(self.doc_lengths) if end is None else end
+        matched_rows, matched_scores = [], []
+        for term in dict.fromkeys(tokenize(query)):
+            term_id = self._term_id(term)
+            if term_id is None:
+                continue
+            first, last = int(self.term_offsets[term_id]), int(self.term_offsets[term_id + 1])
+            postings = self.postings[first:last]
+            lo, hi = np.searchsorted(postings, [start, end])
+            if lo == hi:
+                continue
+
+            rows = postings[lo:hi]
+            frequencies = self.frequencies[first + lo:first + hi].astype(np.float64)
+            idf = math.log(1 + (self.documents - (last - first) + 0.5) / ((last - first) + 0.5))
+            length_norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[rows] / self.average_length)
+            matched_rows.append(rows)
+            matched_scores.append(idf * frequencies * (BM25_K1 + 1) / (frequencies + length_norm))
+
+        if not matched_rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        rows, inverse = np.unique(np.concatenate(matched_rows), return_inverse=True)
+        return rows.astype(np.int64), np.bincount(inverse, weights=np.concatenate(matched_scores))
@@ -0,0 +1,75 @@
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Pre-parsed VADER word and emoji lexicons, built with `python vader_lexicon.py build`
+LEXICON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'vader_lexicon.json.gz')
+
+def _lexicon_version(source, lexicon, emojis):
+    """Identify the scorer and its lexicons so cached scores never outlive them"""
+    payload = json.dumps([sorted(lexicon.items()), sorted(emojis.items())]).encode('utf-8')
+    return f"{source}-{hashlib.sha1(payload).hexdigest()[:16]}"
+
+def _package_analyzer():
+    """vaderSentiment's own analyzer, parsing the text lexicons shipped with the package"""
+    from importlib.metadata import version
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+    sia = SentimentIntensityAnalyzer()
+    return sia, f"vaderSentiment-{version('vaderSentiment')}"
+
+def build_lexicon(output_path=LEXICON_PATH):
+    """Parse the vaderSentiment lexicons once and write them as compact gzipped JSON"""
+    sia, source = _package_analyzer()
+    bundle = {
+        'version': _lexicon_version(source, sia.lexicon, sia.emojis),
+        'lexicon': sia.lexicon,
+        'emojis': sia.emojis
+    }
+    payload = json.dumps(bundle, ensure_ascii=False, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    # mtime=0 keeps rebuilds byte-identical
+    with open(output_path, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as f:
+        f.write(payload)
+    logger.info(f"Wrote {len(sia.lexicon)} words and {len(sia.emojis)} emojis to {output_path}")
+    return bundle['version']
+
+def load_analyzer(path=LEXICON_PATH):
+    """Return (analyzer, version) for vaderSentiment, loading the bundled lexicon when present
+
+    No network access and no text parsing: the bundle already holds the
+    dictionaries the analyzer would build from its .txt files.
+    """
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+    if not os.path.exists(path):
+        logger.warning(f"Bundled lexicon {path} not found, parsing vaderSentiment's own files")
+        sia, source = _package_analyzer()
+        return sia, _lexicon_version(source, sia.lexicon, sia.emojis)
+
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        bundle = json.load(f)
+    # Skip __init__, which would read and parse the text lexicons again
+    sia = SentimentIntensityAnalyzer.__new__(SentimentIntensityAnalyzer)
+    sia.lexicon = bundle['lexicon']
+    sia.emojis = bundle['emojis']
+    return sia, bundle['version']
+
+def main():
+    parser = argparse.ArgumentParser(description="Bundle the VADER lexicon for offline startup")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build = subparsers.add_parser('build', help="Write the pre-parsed lexicon bundle")
+    build.add_argument('--output', default=LEXICON_PATH)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == 'build':
+        print(build_lexicon(args.output))
+
+if __name__ == "__main__":
+    main()